@@ -5,38 +5,158 @@ This creates a single executable that includes Python and all dependencies.
 
 import os
 import sys
+import json
+import hashlib
 import subprocess
+import importlib.util
 import platform
+import functools
+import tempfile
 from pathlib import Path
 
+# pefile 2024.8.26 makes PyInstaller's binary-vs-data reclassification pass
+# crawl (tens of minutes on Windows), so keep it out of the build environment.
+PEFILE_REQUIREMENT = "pefile!=2024.8.26"
+
+# Remembers the inputs (and resulting executable) of the last successful build per platform
+BUILD_CACHE_FILE = Path.home() / ".intune_packager" / "installer_cache.json"
+
+# Everything that ends up inside the executable
+BUILD_INPUTS = ["build_installer.py", "requirements.txt", "setup.py", "src", "templates", "examples",
+                "USER_GUIDE.md", "ARCHITECTURE.md", "README.md"]
+
 def print_step(message):
     print(f"\n{'='*70}")
     print(f"  {message}")
     print(f"{'='*70}\n")
 
 def run_command(cmd, description):
-    """Run command and show output."""
+    """Run command and stream its output as it is produced."""
     print(f"Running: {' '.join(cmd)}")
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          text=True, bufsize=1) as process:
+        for line in process.stdout:
+            sys.stdout.write(line)
+        returncode = process.wait()
+    if returncode != 0:
         print(f"❌ {description} failed!")
-        print(result.stderr)
         return False
     print(f"✅ {description} completed")
     return True
 
+def load_datas_manifest(manifest_path):
+    """Load per-file digests from the last build (empty if missing or unreadable)."""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def compute_build_key(project_dir, spec_content):
+    """
+    Hash the spec, the interpreter version and every bundled input file.
+    
+    Per-file digests are kept in build/datas.manifest and only recomputed for
+    files whose size or modification time changed since the last build.
+    """
+    manifest_path = project_dir / "build" / "datas.manifest"
+    old_manifest = load_datas_manifest(manifest_path)
+    manifest = {}
+    
+    digest = hashlib.sha256()
+    digest.update(spec_content.encode('utf-8'))
+    digest.update(sys.version.encode('utf-8'))
+    
+    for name in BUILD_INPUTS:
+        path = project_dir / name
+        files = sorted(path.rglob("*")) if path.is_dir() else [path]
+        for file_path in files:
+            if not file_path.is_file() or "__pycache__" in file_path.parts:
+                continue
+            
+            rel_path = file_path.relative_to(project_dir).as_posix()
+            stat = file_path.stat()
+            entry = old_manifest.get(rel_path)
+            if not entry or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+                entry = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "blake2b": hashlib.blake2b(file_path.read_bytes()).hexdigest(),
+                }
+            manifest[rel_path] = entry
+            
+            digest.update(rel_path.encode('utf-8'))
+            digest.update(entry["blake2b"].encode('ascii'))
+    
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    
+    return digest.hexdigest()
+
+def load_build_cache():
+    """Load cached build keys (empty if missing or unreadable)."""
+    try:
+        with open(BUILD_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_build_cache(cache):
+    """Persist cached build keys."""
+    BUILD_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(BUILD_CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2)
+
+def build_cache_entry(build_key, exe_path):
+    """Cache entry tying a build key to the executable it produced."""
+    stat = exe_path.stat()
+    return {"build_key": build_key, "exe_size": stat.st_size, "exe_mtime_ns": stat.st_mtime_ns}
+
+def is_build_cached(entry, build_key, exe_path):
+    """
+    True if the cached build matches build_key and its executable is untouched.
+    
+    Another build (e.g. build_installer_minimal.py) writing the same dist/
+    executable changes its size or modification time, which forces a rebuild.
+    """
+    if not isinstance(entry, dict) or entry.get("build_key") != build_key:
+        return False
+    try:
+        stat = exe_path.stat()
+    except OSError:
+        return False
+    return entry.get("exe_size") == stat.st_size and entry.get("exe_mtime_ns") == stat.st_mtime_ns
+
+def list_dist_artifacts(dist_dir):
+    """Map each file in dist/ to its size using a single directory scan."""
+    try:
+        with os.scandir(dist_dir) as entries:
+            return {entry.name: entry.stat().st_size for entry in entries if entry.is_file()}
+    except FileNotFoundError:
+        return {}
+
+@functools.lru_cache(maxsize=None)
+def get_project_dir():
+    """Resolve the project directory once."""
+    return Path(__file__).resolve().parent
+
+@functools.lru_cache(maxsize=None)
+def get_exe_name():
+    """Name of the built executable on this platform."""
+    if platform.system() == "Windows":
+        return "IntuneAppPackager-Installer.exe"
+    return "IntuneAppPackager-Installer"
+
 def main():
     print_step("Building Standalone Installer")
     
-    project_dir = Path(__file__).parent.absolute()
+    project_dir = get_project_dir()
     os.chdir(project_dir)
     
     # Check if PyInstaller is installed
     print("Checking for PyInstaller...")
-    result = subprocess.run([sys.executable, "-m", "pip", "show", "pyinstaller"], 
-                          capture_output=True)
-    
-    if result.returncode != 0:
+    if importlib.util.find_spec("PyInstaller") is None:
         print("PyInstaller not found. Installing...")
         if not run_command([sys.executable, "-m", "pip", "install", "pyinstaller"], 
                           "Install PyInstaller"):
@@ -48,6 +168,12 @@ def main():
                       "Install package"):
         sys.exit(1)
     
+    # Keep PyInstaller's analysis phase off the slow pefile release
+    print("\nPinning pefile for PyInstaller...")
+    if not run_command([sys.executable, "-m", "pip", "install", PEFILE_REQUIREMENT], 
+                      "Pin pefile"):
+        sys.exit(1)
+    
     # Create the main entry point for the installer
     print("\nCreating installer entry point...")
     
@@ -71,20 +197,27 @@ if __name__ == '__main__':
     run_installer()
 """
     
-    entry_point = project_dir / "installer_main.py"
+    # Private scratch directory so concurrent builds never share an entry point
+    build_tmp = tempfile.TemporaryDirectory(prefix="intune_installer_")
+    entry_point = Path(build_tmp.name) / "installer_main.py"
     with open(entry_point, 'w') as f:
         f.write(installer_script)
     
     # Create PyInstaller spec
     print("\nCreating PyInstaller specification...")
     
+    # Set INTUNE_FAST_BUILD for iterative builds; release builds keep UPX on
+    fast_build = bool(os.environ.get("INTUNE_FAST_BUILD"))
+    if fast_build:
+        print("INTUNE_FAST_BUILD set - skipping UPX compression")
+    
     spec_content = f"""
 # -*- mode: python ; coding: utf-8 -*-
 
 block_cipher = None
 
 a = Analysis(
-    ['installer_main.py'],
+    ['{entry_point.as_posix()}'],
     pathex=['{project_dir}'],
     binaries=[],
     datas=[
@@ -129,7 +262,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx={not fast_build},
     upx_exclude=[],
     runtime_tmpdir=None,
     console=True,
@@ -146,27 +279,47 @@ exe = EXE(
     with open(spec_file, 'w') as f:
         f.write(spec_content)
     
-    # Build with PyInstaller
-    print("\nBuilding executable with PyInstaller...")
-    print("This may take a few minutes...")
+    # Check output
+    exe_name = get_exe_name()
+    exe_path = project_dir / "dist" / exe_name
     
-    if not run_command([sys.executable, "-m", "PyInstaller", "--clean", str(spec_file)], 
-                      "Build executable"):
-        sys.exit(1)
+    # Skip PyInstaller entirely when nothing that goes into the build changed
+    # The scratch path differs per run, so leave it out of the key
+    build_key = compute_build_key(project_dir,
+                                  spec_content.replace(entry_point.as_posix(), entry_point.name))
+    build_cache = load_build_cache()
+    cache_slot = platform.platform()
     
-    # Check output
-    if platform.system() == "Windows":
-        exe_name = "IntuneAppPackager-Installer.exe"
+    if is_build_cached(build_cache.get(cache_slot), build_key, exe_path):
+        print("\nBuild inputs unchanged - reusing existing executable")
     else:
-        exe_name = "IntuneAppPackager-Installer"
+        # Build with PyInstaller
+        print("\nBuilding executable with PyInstaller...")
+        print("This may take a few minutes...")
+        
+        # Byte-compile the package in parallel up front (explicit -j, not -j0)
+        if not run_command([sys.executable, "-m", "compileall", "-q", "-j", str(os.cpu_count() or 1),
+                            "src/intune_packager"], "Precompile package"):
+            sys.exit(1)
+        
+        if not run_command([sys.executable, "-m", "PyInstaller", "--clean", "--noconfirm", str(spec_file)], 
+                          "Build executable"):
+            sys.exit(1)
+        
+        if exe_path.exists():
+            build_cache[cache_slot] = build_cache_entry(build_key, exe_path)
+            save_build_cache(build_cache)
     
-    exe_path = project_dir / "dist" / exe_name
+    artifacts = list_dist_artifacts(exe_path.parent)
     
-    if exe_path.exists():
-        size_mb = exe_path.stat().st_size / (1024 * 1024)
+    if exe_name in artifacts:
+        size_mb = artifacts[exe_name] / (1024 * 1024)
         print_step("Build Successful!")
         print(f"✅ Executable created: {exe_path}")
         print(f"📦 Size: {size_mb:.1f} MB")
+        for name, size in sorted(artifacts.items()):
+            if name != exe_name:
+                print(f"   + {name}: {size / (1024 * 1024):.1f} MB")
         print(f"\n🚀 You can now distribute: {exe_name}")
         print(f"   Users don't need Python installed!")
         print(f"\n   To run: ./{exe_name}")
@@ -175,7 +328,7 @@ exe = EXE(
         sys.exit(1)
     
     # Clean up
-    entry_point.unlink()
+    build_tmp.cleanup()
     
     print("\n" + "="*70)
 
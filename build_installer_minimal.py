@@ -7,29 +7,51 @@ Use this on Windows ARM64 where aiohttp/httptools don't have pre-built wheels.
 import os
 import sys
 import subprocess
+import importlib.util
 import platform
+import functools
+import tempfile
 from pathlib import Path
 
+# pefile 2024.8.26 makes PyInstaller's binary-vs-data reclassification pass
+# crawl (tens of minutes on Windows), so keep it out of the build environment.
+PEFILE_REQUIREMENT = "pefile!=2024.8.26"
+
 def print_step(message):
     print(f"\n{'='*70}")
     print(f"  {message}")
     print(f"{'='*70}\n")
 
 def run_command(cmd, description):
-    """Run command and show output."""
+    """Run command and stream its output as it is produced."""
     print(f"Running: {' '.join(cmd)}")
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          text=True, bufsize=1) as process:
+        for line in process.stdout:
+            sys.stdout.write(line)
+        returncode = process.wait()
+    if returncode != 0:
         print(f"❌ {description} failed!")
-        print(result.stderr)
         return False
     print(f"✅ {description} completed")
     return True
 
+@functools.lru_cache(maxsize=None)
+def get_project_dir():
+    """Resolve the project directory once."""
+    return Path(__file__).resolve().parent
+
+@functools.lru_cache(maxsize=None)
+def get_exe_name():
+    """Name of the built executable on this platform."""
+    if platform.system() == "Windows":
+        return "IntuneAppPackager-Installer.exe"
+    return "IntuneAppPackager-Installer"
+
 def main():
     print_step("Building Standalone Installer (Minimal)")
     
-    project_dir = Path(__file__).parent.absolute()
+    project_dir = get_project_dir()
     os.chdir(project_dir)
     
     # Install minimal dependencies
@@ -40,15 +62,18 @@ def main():
     
     # Check if PyInstaller is installed
     print("\nChecking for PyInstaller...")
-    result = subprocess.run([sys.executable, "-m", "pip", "show", "pyinstaller"], 
-                          capture_output=True)
-    
-    if result.returncode != 0:
+    if importlib.util.find_spec("PyInstaller") is None:
         print("PyInstaller not found. Installing...")
         if not run_command([sys.executable, "-m", "pip", "install", "pyinstaller"], 
                           "Install PyInstaller"):
             sys.exit(1)
     
+    # Keep PyInstaller's analysis phase off the slow pefile release
+    print("\nPinning pefile for PyInstaller...")
+    if not run_command([sys.executable, "-m", "pip", "install", PEFILE_REQUIREMENT], 
+                      "Pin pefile"):
+        sys.exit(1)
+    
     # Create the main entry point for the installer
     print("\nCreating installer entry point...")
     
@@ -72,20 +97,27 @@ if __name__ == '__main__':
     run_installer()
 """
     
-    entry_point = project_dir / "installer_main.py"
+    # Private scratch directory so concurrent builds never share an entry point
+    build_tmp = tempfile.TemporaryDirectory(prefix="intune_installer_")
+    entry_point = Path(build_tmp.name) / "installer_main.py"
     with open(entry_point, 'w') as f:
         f.write(installer_script)
     
     # Create PyInstaller spec
     print("\nCreating PyInstaller specification...")
     
+    # Set INTUNE_FAST_BUILD for iterative builds; release builds keep UPX on
+    fast_build = bool(os.environ.get("INTUNE_FAST_BUILD"))
+    if fast_build:
+        print("INTUNE_FAST_BUILD set - skipping UPX compression")
+    
     spec_content = f"""
 # -*- mode: python ; coding: utf-8 -*-
 
 block_cipher = None
 
 a = Analysis(
-    ['installer_main.py'],
+    ['{entry_point.as_posix()}'],
     pathex=['{project_dir}'],
     binaries=[],
     datas=[
@@ -128,7 +160,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx={not fast_build},
     upx_exclude=[],
     runtime_tmpdir=None,
     console=True,
@@ -149,16 +181,17 @@ exe = EXE(
     print("\nBuilding executable with PyInstaller...")
     print("This may take a few minutes...")
     
-    if not run_command([sys.executable, "-m", "PyInstaller", "--clean", str(spec_file)], 
+    # Byte-compile the package in parallel up front (explicit -j, not -j0)
+    if not run_command([sys.executable, "-m", "compileall", "-q", "-j", str(os.cpu_count() or 1),
+                        "src/intune_packager"], "Precompile package"):
+        sys.exit(1)
+    
+    if not run_command([sys.executable, "-m", "PyInstaller", "--clean", "--noconfirm", str(spec_file)], 
                       "Build executable"):
         sys.exit(1)
     
     # Check output
-    if platform.system() == "Windows":
-        exe_name = "IntuneAppPackager-Installer.exe"
-    else:
-        exe_name = "IntuneAppPackager-Installer"
-    
+    exe_name = get_exe_name()
     exe_path = project_dir / "dist" / exe_name
     
     if exe_path.exists():
@@ -178,7 +211,7 @@ exe = EXE(
         sys.exit(1)
     
     # Clean up
-    entry_point.unlink()
+    build_tmp.cleanup()
     
     print("\n" + "="*70)
 
@@ -3,11 +3,29 @@
 Example: Generate PowerShell scripts from EWMapa configuration
 """
 
+import io
 import yaml
+from itertools import islice
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from intune_packager.models import ApplicationProfile
 from intune_packager.script_generator import ScriptGenerator
 
+# Prefer the libyaml-backed loader; fall back to pure Python without libyaml
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+def encode_script(script_content):
+    """Encode a script as UTF-8 with Windows (CRLF) line endings."""
+    return script_content.encode('utf-8').replace(b'\n', b'\r\n')
+
+def write_script(output_path, payload):
+    """Write an encoded script payload to disk."""
+    output_path.write_bytes(payload)
+    return output_path
+
 def main():
     print("="*70)
     print("  Intune App Packager - Example Script Generation")
@@ -19,7 +37,7 @@ def main():
     print(f"📄 Loading configuration: {config_path}")
     
     with open(config_path, 'r') as f:
-        config_data = yaml.safe_load(f)
+        config_data = yaml.load(f, Loader=SafeLoader)
     
     # Create ApplicationProfile from config
     print("🔧 Creating application profile...")
@@ -40,12 +58,16 @@ def main():
     output_dir = Path(__file__).parent.parent / "output" / "ewmapa_scripts"
     output_dir.mkdir(parents=True, exist_ok=True)
     
+    # Encode every payload first, then submit all writes as one batch
+    payloads = {
+        output_dir / script_name: encode_script(script_content)
+        for script_name, script_content in scripts.items()
+    }
+    with ThreadPoolExecutor(max_workers=len(payloads)) as executor:
+        list(executor.map(write_script, payloads.keys(), payloads.values()))
+    
     for script_name, script_content in scripts.items():
-        output_path = output_dir / script_name
-        with open(output_path, 'w', encoding='utf-8', newline='\r\n') as f:
-            f.write(script_content)
-        
-        lines = len(script_content.split('\n'))
+        lines = script_content.count('\n') + 1
         size = len(script_content)
         print(f"   ✅ {script_name}: {lines} lines, {size} bytes")
     
@@ -56,12 +78,14 @@ def main():
     # Show preview of install script
     print("📋 Preview of install.ps1 (first 30 lines):")
     print("-"*70)
-    install_script_lines = scripts['install.ps1'].split('\n')
-    for i, line in enumerate(install_script_lines[:30], 1):
+    install_script = scripts['install.ps1']
+    for i, line in enumerate(islice(io.StringIO(install_script), 30), 1):
+        line = line.rstrip('\n')
         print(f"{i:3d} | {line}")
     
-    if len(install_script_lines) > 30:
-        print(f"... ({len(install_script_lines) - 30} more lines)")
+    total_lines = install_script.count('\n') + 1
+    if total_lines > 30:
+        print(f"... ({total_lines - 30} more lines)")
     
     print("-"*70)
     print()
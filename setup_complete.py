@@ -5,9 +5,13 @@ Single command installation with all dependencies.
 
 import os
 import sys
+import hashlib
+import importlib.util
+import shutil
 import subprocess
 import platform
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 def print_header(message):
     """Print formatted header."""
@@ -20,16 +24,53 @@ def print_step(step, message):
     print(f"[{step}] {message}")
 
 def run_command(cmd, description):
-    """Run command and handle errors."""
+    """Run command, streaming its output, and handle errors."""
     print(f"   Running: {' '.join(cmd)}")
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        print(f"   ✅ {description} - Success")
-        return True
-    except subprocess.CalledProcessError as e:
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          text=True, bufsize=1) as process:
+        for line in process.stdout:
+            sys.stdout.write(f"   {line}")
+        returncode = process.wait()
+    if returncode != 0:
         print(f"   ❌ {description} - Failed")
-        print(f"   Error: {e.stderr}")
         return False
+    print(f"   ✅ {description} - Success")
+    return True
+
+def pip_install_command(*args):
+    """Build a package install command, preferring uv when it is on PATH."""
+    if shutil.which("uv"):
+        return ["uv", "pip", "install", "--python", sys.executable, *args]
+    return [sys.executable, "-m", "pip", "install", *args]
+
+# Fingerprint of the last successful complete install into this interpreter; the
+# other setup script and other Pythons keep their own key files
+SETUP_KEY_FILE = (
+    Path.home() / ".intune_packager"
+    / f".setup_key-{hashlib.sha1(sys.executable.encode('utf-8')).hexdigest()}-complete"
+)
+
+def compute_setup_key(*input_files):
+    """Hash the install inputs together with the target interpreter."""
+    digest = hashlib.sha256()
+    for input_file in input_files:
+        digest.update(Path(input_file).read_bytes())
+    digest.update(sys.version.encode("utf-8"))
+    digest.update(sys.executable.encode("utf-8"))
+    return digest.hexdigest()
+
+def install_is_current(setup_key):
+    """Check whether the package was already installed from identical inputs."""
+    try:
+        stored_key = SETUP_KEY_FILE.read_text(encoding="utf-8").strip()
+    except OSError:
+        return False
+    return stored_key == setup_key and importlib.util.find_spec("intune_packager") is not None
+
+def save_setup_key(setup_key):
+    """Remember the inputs of a successful install."""
+    SETUP_KEY_FILE.parent.mkdir(parents=True, exist_ok=True)
+    SETUP_KEY_FILE.write_text(setup_key, encoding="utf-8")
 
 def check_python_version():
     """Check if Python version is sufficient."""
@@ -45,7 +86,7 @@ def main():
     print_header("Intune App Packager - Complete Setup")
     
     # Check Python version
-    print_step("1/6", "Checking Python version")
+    print_step("1/5", "Checking Python version")
     if not check_python_version():
         sys.exit(1)
     
@@ -53,18 +94,25 @@ def main():
     project_dir = Path(__file__).parent.absolute()
     os.chdir(project_dir)
     
-    print_step("2/6", "Installing Python dependencies")
-    if not run_command([sys.executable, "-m", "pip", "install", "--upgrade", "pip"], "Upgrade pip"):
-        sys.exit(1)
-    
-    if not run_command([sys.executable, "-m", "pip", "install", "-e", "."], "Install package"):
-        sys.exit(1)
-    
-    print_step("3/6", "Verifying installation")
-    if not run_command([sys.executable, "-m", "pip", "list"], "List installed packages"):
-        sys.exit(1)
-    
-    print_step("4/6", "Creating required directories")
+    print_step("2/5", "Installing Python dependencies")
+    setup_key = compute_setup_key("setup.py", "requirements.txt")
+    if install_is_current(setup_key):
+        print("   ✅ Already installed - dependencies unchanged, skipping pip")
+    else:
+        # One pip run upgrades pip and installs the package (single resolver warmup)
+        if not run_command(pip_install_command("--upgrade", "pip", "-e", "."),
+                           "Install package"):
+            sys.exit(1)
+        save_setup_key(setup_key)
+    
+    # Compile the PowerShell templates now so the first generation run is fast
+    if not run_command([sys.executable, "-c",
+                        "from intune_packager.script_generator import DEFAULT_BYTECODE_CACHE_DIR, ScriptGenerator; "
+                        "ScriptGenerator(bytecode_cache_dir=DEFAULT_BYTECODE_CACHE_DIR).warm_cache()"],
+                       "Warm template cache"):
+        print("   ⚠️  Template cache warm-up failed (templates will compile on first use)")
+    
+    print_step("3/5", "Creating required directories")
     dirs_to_create = [
         "output",
         "packages",
@@ -72,11 +120,13 @@ def main():
         os.path.expanduser("~/.intune_packager")
     ]
     
+    with ThreadPoolExecutor() as executor:
+        list(executor.map(lambda p: Path(p).mkdir(parents=True, exist_ok=True), dirs_to_create))
+    
     for dir_path in dirs_to_create:
-        Path(dir_path).mkdir(parents=True, exist_ok=True)
         print(f"   ✅ Created: {dir_path}")
     
-    print_step("5/6", "Testing script generator")
+    print_step("4/5", "Testing script generator")
     test_script = """
 from intune_packager.models import ApplicationProfile, Installer, DetectionRule
 from intune_packager.script_generator import ScriptGenerator
@@ -113,16 +163,11 @@ print("✅ Script generation test passed")
 print(f"   - Generated {len(scripts)} scripts")
 """
     
-    test_file = project_dir / "test_installation.py"
-    with open(test_file, 'w') as f:
-        f.write(test_script)
-    
-    if run_command([sys.executable, str(test_file)], "Test script generation"):
-        test_file.unlink()  # Clean up test file
-    else:
+    # Feed the test to the interpreter directly, no scratch file on disk
+    if not run_command([sys.executable, "-c", test_script], "Test script generation"):
         print("   ⚠️  Script generation test failed (check dependencies)")
     
-    print_step("6/6", "Setup complete!")
+    print_step("5/5", "Setup complete!")
     
     print_header("Installation Summary")
     
@@ -5,8 +5,12 @@ Installs only core dependencies (no aiohttp/fastapi).
 
 import os
 import sys
+import hashlib
+import importlib.util
+import shutil
 import subprocess
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 def print_header(message):
     """Print formatted header."""
@@ -19,16 +23,53 @@ def print_step(step, message):
     print(f"[{step}] {message}")
 
 def run_command(cmd, description):
-    """Run command and handle errors."""
+    """Run command, streaming its output, and handle errors."""
     print(f"   Running: {' '.join(cmd)}")
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        print(f"   ✅ {description} - Success")
-        return True
-    except subprocess.CalledProcessError as e:
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          text=True, bufsize=1) as process:
+        for line in process.stdout:
+            sys.stdout.write(f"   {line}")
+        returncode = process.wait()
+    if returncode != 0:
         print(f"   ❌ {description} - Failed")
-        print(f"   Error: {e.stderr}")
         return False
+    print(f"   ✅ {description} - Success")
+    return True
+
+def pip_install_command(*args):
+    """Build a package install command, preferring uv when it is on PATH."""
+    if shutil.which("uv"):
+        return ["uv", "pip", "install", "--python", sys.executable, *args]
+    return [sys.executable, "-m", "pip", "install", *args]
+
+# Fingerprint of the last successful minimal install into this interpreter; the
+# other setup script and other Pythons keep their own key files
+SETUP_KEY_FILE = (
+    Path.home() / ".intune_packager"
+    / f".setup_key-{hashlib.sha1(sys.executable.encode('utf-8')).hexdigest()}-minimal"
+)
+
+def compute_setup_key(*input_files):
+    """Hash the install inputs together with the target interpreter."""
+    digest = hashlib.sha256()
+    for input_file in input_files:
+        digest.update(Path(input_file).read_bytes())
+    digest.update(sys.version.encode("utf-8"))
+    digest.update(sys.executable.encode("utf-8"))
+    return digest.hexdigest()
+
+def install_is_current(setup_key):
+    """Check whether the package was already installed from identical inputs."""
+    try:
+        stored_key = SETUP_KEY_FILE.read_text(encoding="utf-8").strip()
+    except OSError:
+        return False
+    return stored_key == setup_key and importlib.util.find_spec("intune_packager") is not None
+
+def save_setup_key(setup_key):
+    """Remember the inputs of a successful install."""
+    SETUP_KEY_FILE.parent.mkdir(parents=True, exist_ok=True)
+    SETUP_KEY_FILE.write_text(setup_key, encoding="utf-8")
 
 def check_python_version():
     """Check if Python version is sufficient."""
@@ -52,18 +93,24 @@ def main():
     project_dir = Path(__file__).parent.absolute()
     os.chdir(project_dir)
     
-    print_step("2/5", "Upgrading pip")
-    if not run_command([sys.executable, "-m", "pip", "install", "--upgrade", "pip"], "Upgrade pip"):
-        sys.exit(1)
-    
-    print_step("3/5", "Installing minimal dependencies")
-    print("   ℹ️  Using requirements-minimal.txt (no aiohttp/fastapi)")
-    if not run_command([sys.executable, "-m", "pip", "install", "-r", "requirements-minimal.txt"], "Install dependencies"):
-        sys.exit(1)
-    
-    print_step("4/5", "Installing package in editable mode")
-    if not run_command([sys.executable, "-m", "pip", "install", "-e", ".", "--no-deps"], "Install package"):
-        sys.exit(1)
+    setup_key = compute_setup_key("setup.py", "requirements-minimal.txt")
+    if install_is_current(setup_key):
+        print_step("2-4/5", "Installing dependencies")
+        print("   ✅ Already installed - dependencies unchanged, skipping pip")
+    else:
+        print_step("2/5", "Upgrading pip")
+        if not run_command(pip_install_command("--upgrade", "pip"), "Upgrade pip"):
+            sys.exit(1)
+        
+        print_step("3/5", "Installing minimal dependencies")
+        print("   ℹ️  Using requirements-minimal.txt (no aiohttp/fastapi)")
+        if not run_command(pip_install_command("-r", "requirements-minimal.txt"), "Install dependencies"):
+            sys.exit(1)
+        
+        print_step("4/5", "Installing package in editable mode")
+        if not run_command(pip_install_command("-e", ".", "--no-deps"), "Install package"):
+            sys.exit(1)
+        save_setup_key(setup_key)
     
     print_step("5/5", "Creating directories")
     dirs_to_create = [
@@ -72,8 +119,10 @@ def main():
         "logs",
     ]
     
+    with ThreadPoolExecutor() as executor:
+        list(executor.map(lambda p: Path(p).mkdir(parents=True, exist_ok=True), dirs_to_create))
+    
     for dir_path in dirs_to_create:
-        Path(dir_path).mkdir(parents=True, exist_ok=True)
         print(f"   ✅ Created: {dir_path}")
     
     print_header("Installation Complete!")
@@ -6,10 +6,14 @@ __version__ = "0.1.0"
 __author__ = "Your Name"
 __license__ = "MIT"
 
-from .analyzer import ApplicationAnalyzer
-from .converter import IntuneWinConverter
-from .orchestrator import PackageOrchestrator
-from .config import ConfigManager
+# Public classes are imported on first access (PEP 562) so that importing the
+# package, e.g. for __version__, does not pull in every subsystem.
+_LAZY_IMPORTS = {
+    "ApplicationAnalyzer": ".analyzer",
+    "IntuneWinConverter": ".converter",
+    "PackageOrchestrator": ".orchestrator",
+    "ConfigManager": ".config",
+}
 
 __all__ = [
     "ApplicationAnalyzer",
@@ -17,3 +21,18 @@ __all__ = [
     "PackageOrchestrator",
     "ConfigManager",
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    from importlib import import_module
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,40 @@
+"""
+Shared JSON encoding.
+Uses orjson when it is installed and the standard library json module otherwise.
+"""
+
+import json
+from typing import Any, Callable, Optional
+
+# Optional faster JSON parser/encoder; stdlib json is the fallback
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def dumps_bytes(data: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Serialize data to UTF-8 encoded JSON.
+    
+    Args:
+        data: Value to serialize; non-string dict keys (e.g. from YAML) are allowed
+        indent: Indent nested values by two spaces instead of writing compact JSON
+        default: Called for values JSON has no type for (e.g. str)
+        
+    Returns:
+        The JSON document as bytes
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=default, option=option)
+    if indent:
+        return json.dumps(data, indent=2, default=default, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, separators=(',', ':'), default=default, ensure_ascii=False).encode('utf-8')
+
+
+# Parses str or bytes; orjson.JSONDecodeError subclasses json.JSONDecodeError
+loads = orjson.loads if ORJSON_AVAILABLE else json.loads
@@ -0,0 +1,27 @@
+"""
+Shared PyYAML loading.
+Imports PyYAML lazily and picks the libyaml-backed loader/dumper when available.
+"""
+
+import functools
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def load_yaml_module():
+    """
+    Import PyYAML on first use.
+    
+    Returns:
+        Tuple of (yaml module, safe loader class, safe dumper class)
+    """
+    import yaml
+    # Prefer the libyaml-backed loader/dumper; fall back to pure Python without libyaml
+    try:
+        from yaml import CSafeLoader as safe_loader, CSafeDumper as safe_dumper
+    except ImportError:
+        from yaml import SafeLoader as safe_loader, SafeDumper as safe_dumper
+    logger.debug(f"YAML files use {safe_loader.__name__}/{safe_dumper.__name__}")
+    return yaml, safe_loader, safe_dumper
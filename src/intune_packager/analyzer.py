@@ -4,33 +4,247 @@ Analyzes EXE files to extract metadata, detect dependencies, and identify instal
 """
 
 import os
+import copy
+import functools
+import importlib.util
+import itertools
+import mmap
+import hashlib
 import logging
-from typing import Dict, List, Optional
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
 from pathlib import Path
 
-try:
-    import pefile
-    PEFILE_AVAILABLE = True
-except ImportError:
-    PEFILE_AVAILABLE = False
+# pefile is probed here but only imported on the first PE analysis
+PEFILE_AVAILABLE = importlib.util.find_spec("pefile") is not None
+if not PEFILE_AVAILABLE:
     logging.warning("pefile library not available. PE analysis will be limited.")
 
+# pefile.DIRECTORY_ENTRY indices, fixed by the PE/COFF specification
+_IMPORT_DIRECTORY = 1
+_RESOURCE_DIRECTORY = 2
+
 logger = logging.getLogger(__name__)
 
+# Installer signatures, highest priority first; the first one found wins
+_INSTALLER_SIGNATURES = (
+    (b'Nullsoft', "NSIS"),
+    (b'NSIS', "NSIS"),
+    (b'Inno Setup', "Inno Setup"),
+    (b'InnoSetup', "Inno Setup"),
+    (b'Wise Installation', "Wise Installer"),
+    (b'InstallShield', "InstallShield"),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_pefile():
+    """Import pefile on first use."""
+    import pefile
+    return pefile
+
+
+def _read_header(path: str, size: int):
+    """Read the first `size` bytes of a file with a single positional read."""
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        st = os.fstat(fd)
+        if hasattr(os, 'pread'):
+            header = os.pread(fd, size, 0)
+        else:
+            # os.pread is POSIX-only
+            header = os.read(fd, size)
+        return header, st
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def _open_mapped(path: str):
+    """Map a file read-only so header sniffing and PE parsing share one view."""
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            yield b''
+            return
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+_MACHINE_TYPES = {
+    0x014c: "I386",
+    0x8664: "AMD64",
+    0x0200: "IA64",
+    0xAA64: "ARM64",
+    0x01c4: "ARM",
+}
+
+_SUBSYSTEMS = {
+    1: "Native",
+    2: "Windows GUI",
+    3: "Windows CUI (Console)",
+    5: "OS/2 CUI",
+    7: "POSIX CUI",
+    9: "Windows CE GUI",
+}
+
+_VERSION_KEY_MAPPING = {
+    'ProductName': 'product_name',
+    'FileDescription': 'description',
+    'FileVersion': 'file_version',
+    'ProductVersion': 'product_version',
+    'CompanyName': 'company_name',
+    'LegalCopyright': 'copyright',
+    'InternalName': 'internal_name',
+    'OriginalFilename': 'original_filename',
+}
+
+# Text report layout: (line template, key, default). Rows whose default is
+# _OMIT are left out when the key is missing.
+_OMIT = object()
+_REPORT_RULE = "=" * 70
+_SECTION_RULE = "-" * 70
+_BASIC_FIELDS = (
+    ("File Name:     {}", 'file_name', 'N/A'),
+    ("File Path:     {}", 'file_path', 'N/A'),
+    ("File Size:     {} MB", 'file_size_mb', 0),
+)
+_VERSION_FIELDS = (
+    ("Product Name:  {}", 'product_name', _OMIT),
+    ("File Version:  {}", 'file_version', _OMIT),
+    ("Product Ver:   {}", 'product_version', _OMIT),
+    ("Company:       {}", 'company_name', _OMIT),
+    ("Description:   {}", 'description', _OMIT),
+)
+_TECH_FIELDS = (
+    ("Machine Type:  {}", 'machine_type', _OMIT),
+    ("64-bit:        {}", 'is_64bit', False),
+    ("Subsystem:     {}", 'subsystem', _OMIT),
+)
+
+
+def _format_section(title: str, fields: tuple, data: Dict[str, any]) -> List[str]:
+    """Render one titled report section followed by a blank line."""
+    rows = [
+        template.format(data.get(key, default))
+        for template, key, default in fields
+        if default is not _OMIT or key in data
+    ]
+    return [title, _SECTION_RULE, *rows, ""]
+
+
+class AnalysisCache:
+    """
+    Persistent JSON cache of analyze() results.
+    
+    Entries are keyed by absolute path and are only reused while the file's
+    size, modification time and SHA-1 of its first 8 KB are unchanged.
+    """
+    
+    DEFAULT_PATH = Path.home() / ".cache" / "intune-packager" / "analysis.json"
+    HEADER_SIZE = 8192
+    
+    def __init__(self, cache_path: Optional[str] = None):
+        """
+        Initialize the cache.
+        
+        Args:
+            cache_path: Location of the cache file. If None, uses DEFAULT_PATH.
+        """
+        self.cache_path = Path(cache_path) if cache_path else self.DEFAULT_PATH
+        self._lock = threading.Lock()
+        self._entries = self._load()
+    
+    def _load(self) -> Dict[str, Dict]:
+        """Load cache entries from disk (empty if missing or unreadable)."""
+        import json
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError) as e:
+            logger.debug(f"Analysis cache not loaded: {e}")
+            return {}
+    
+    def _fingerprint(self, path: str) -> Dict[str, any]:
+        """Identify the current contents of a file cheaply."""
+        header, st = _read_header(path, self.HEADER_SIZE)
+        return {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "header_sha1": hashlib.sha1(header).hexdigest(),
+        }
+    
+    def get(self, path: str) -> Optional[Dict[str, any]]:
+        """
+        Return the cached analysis for a file, or None if missing or stale.
+        
+        Args:
+            path: Path to the analyzed file
+        """
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(path))
+        if entry is None or entry.get("fingerprint") != self._fingerprint(path):
+            return None
+        return copy.deepcopy(entry["result"])
+    
+    def put(self, path: str, result: Dict[str, any]) -> None:
+        """
+        Store an analysis result and persist the cache.
+        
+        Args:
+            path: Path to the analyzed file
+            result: Dictionary returned by ApplicationAnalyzer.analyze()
+        """
+        entry = {"fingerprint": self._fingerprint(path), "result": copy.deepcopy(result)}
+        with self._lock:
+            self._entries[os.path.abspath(path)] = entry
+            self._save()
+    
+    def _save(self) -> None:
+        """Write the cache atomically (temp file + rename)."""
+        import json
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=str(self.cache_path.parent), suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, default=str)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to save analysis cache: {e}")
+
 
 class ApplicationAnalyzer:
     """Analyzes Windows executable files to extract metadata and dependencies."""
     
-    def __init__(self):
-        """Initialize the analyzer."""
+    # Bytes read by analyze(quick=True); enough for headers and small resource sections
+    QUICK_READ_SIZE = 64 * 1024
+    
+    def __init__(self, cache: Optional[AnalysisCache] = None):
+        """
+        Initialize the analyzer.
+        
+        Args:
+            cache: Optional persistent cache of analysis results
+        """
         self.pefile_available = PEFILE_AVAILABLE
+        self.cache = cache
     
-    def analyze(self, exe_path: str) -> Dict[str, any]:
+    def analyze(self, exe_path: str, quick: bool = False) -> Dict[str, any]:
         """
         Analyze an EXE file and extract comprehensive metadata.
         
         Args:
             exe_path: Path to the EXE file to analyze
+            quick: Only parse the PE headers from the first QUICK_READ_SIZE bytes,
+                skipping imports and sections (version info is kept when its
+                resources fall inside that range)
             
         Returns:
             Dictionary containing analysis results
@@ -39,42 +253,61 @@ class ApplicationAnalyzer:
             FileNotFoundError: If the EXE file doesn't exist
             ValueError: If the file is not a valid PE executable
         """
-        if not os.path.exists(exe_path):
-            raise FileNotFoundError(f"File not found: {exe_path}")
+        # One stat call feeds every size/time field below
+        try:
+            st = os.stat(exe_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {exe_path}") from None
+        
+        # Results only depend on the file contents, so reuse unchanged entries
+        if self.cache is not None:
+            cached = self.cache.get(exe_path)
+            if cached is not None:
+                logger.info(f"Using cached analysis for {exe_path}")
+                cached["file_path"] = exe_path
+                cached["directory"] = str(Path(exe_path).parent)
+                return cached
         
         logger.info(f"Analyzing {exe_path}")
         
         result = {
             "file_path": exe_path,
             "file_name": os.path.basename(exe_path),
-            "file_size": os.path.getsize(exe_path),
-            "file_size_mb": round(os.path.getsize(exe_path) / (1024 * 1024), 2),
+            "file_size": st.st_size,
+            "file_size_mb": round(st.st_size / (1024 * 1024), 2),
         }
         
         # Basic file information
-        result.update(self._get_file_info(exe_path))
+        result.update(self._get_file_info(exe_path, st))
         
         # PE-specific analysis if pefile is available
         if self.pefile_available:
             try:
-                result.update(self._analyze_pe(exe_path))
+                if quick:
+                    result.update(self._analyze_pe_quick(exe_path))
+                else:
+                    result.update(self._analyze_pe(exe_path))
             except Exception as e:
                 logger.warning(f"PE analysis failed: {e}")
                 result["pe_analysis_error"] = str(e)
         else:
             result["pe_analysis_available"] = False
         
+        # Partial results must not shadow a full analysis later
+        if self.cache is not None and self.pefile_available and not quick:
+            self.cache.put(exe_path, result)
+        
         return result
     
-    def _get_file_info(self, exe_path: str) -> Dict[str, any]:
+    def _get_file_info(self, exe_path: str, st: os.stat_result) -> Dict[str, any]:
         """Extract basic file information."""
         file_path = Path(exe_path)
         
         return {
             "directory": str(file_path.parent),
             "extension": file_path.suffix,
-            "created_time": os.path.getctime(exe_path),
-            "modified_time": os.path.getmtime(exe_path),
+            "created_time": st.st_ctime,
+            "modified_time": st.st_mtime,
         }
     
     def _analyze_pe(self, exe_path: str) -> Dict[str, any]:
@@ -90,7 +323,57 @@ class ApplicationAnalyzer:
         if not self.pefile_available:
             return {}
         
-        pe = pefile.PE(exe_path)
+        with _open_mapped(exe_path) as mapped:
+            # Skip the full directory walk; only imports and resources are read below
+            pe = _load_pefile().PE(data=mapped, fast_load=True)
+            try:
+                return self._collect_pe_info(pe)
+            finally:
+                pe.close()
+    
+    def _analyze_pe_quick(self, exe_path: str) -> Dict[str, any]:
+        """
+        Parse only the PE headers from a fixed-size read of the file head.
+        
+        Args:
+            exe_path: Path to the PE file
+            
+        Returns:
+            Dictionary with header-level PE information
+        """
+        head, _ = _read_header(exe_path, self.QUICK_READ_SIZE)
+        pe = _load_pefile().PE(data=head, fast_load=True)
+        try:
+            try:
+                # Resources usually sit near the end of large installers
+                pe.parse_data_directories(directories=[_RESOURCE_DIRECTORY])
+            except Exception as e:
+                logger.debug(f"Resources not within the first {self.QUICK_READ_SIZE} bytes: {e}")
+            
+            result = {
+                "machine_type": self._get_machine_type(pe.FILE_HEADER.Machine),
+                "is_64bit": pe.FILE_HEADER.Machine in [0x8664, 0xAA64],  # AMD64 or ARM64
+                "compilation_timestamp": pe.FILE_HEADER.TimeDateStamp,
+            }
+            if hasattr(pe, 'VS_VERSIONINFO'):
+                result.update(self._extract_version_info(pe))
+            result["entry_point"] = hex(pe.OPTIONAL_HEADER.AddressOfEntryPoint)
+            result["image_base"] = hex(pe.OPTIONAL_HEADER.ImageBase)
+            result["subsystem"] = self._get_subsystem(pe.OPTIONAL_HEADER.Subsystem)
+            return result
+        finally:
+            pe.close()
+    
+    def _collect_pe_info(self, pe: 'pefile.PE') -> Dict[str, any]:
+        """Extract analysis fields from a fast-loaded PE object."""
+        try:
+            pe.parse_data_directories(directories=[
+                _IMPORT_DIRECTORY,
+                _RESOURCE_DIRECTORY,
+            ])
+        except Exception as e:
+            logger.debug(f"Error parsing PE data directories: {e}")
+        
         result = {}
         
         # Machine type
@@ -110,7 +393,7 @@ class ApplicationAnalyzer:
         # Sections
         result["sections"] = [
             {
-                "name": section.Name.decode('utf-8').strip('\x00'),
+                "name": section.Name.rstrip(b'\x00').decode('ascii', 'replace'),
                 "virtual_size": section.Misc_VirtualSize,
                 "virtual_address": section.VirtualAddress,
             }
@@ -126,31 +409,15 @@ class ApplicationAnalyzer:
         # Subsystem
         result["subsystem"] = self._get_subsystem(pe.OPTIONAL_HEADER.Subsystem)
         
-        pe.close()
         return result
     
     def _get_machine_type(self, machine_value: int) -> str:
         """Convert machine type value to readable string."""
-        machine_types = {
-            0x014c: "I386",
-            0x8664: "AMD64",
-            0x0200: "IA64",
-            0xAA64: "ARM64",
-            0x01c4: "ARM",
-        }
-        return machine_types.get(machine_value, f"Unknown (0x{machine_value:04x})")
+        return _MACHINE_TYPES.get(machine_value, f"Unknown (0x{machine_value:04x})")
     
     def _get_subsystem(self, subsystem_value: int) -> str:
         """Convert subsystem value to readable string."""
-        subsystems = {
-            1: "Native",
-            2: "Windows GUI",
-            3: "Windows CUI (Console)",
-            5: "OS/2 CUI",
-            7: "POSIX CUI",
-            9: "Windows CE GUI",
-        }
-        return subsystems.get(subsystem_value, f"Unknown ({subsystem_value})")
+        return _SUBSYSTEMS.get(subsystem_value, f"Unknown ({subsystem_value})")
     
     def _extract_version_info(self, pe: 'pefile.PE') -> Dict[str, any]:
         """Extract version information from PE file."""
@@ -166,44 +433,41 @@ class ApplicationAnalyzer:
                                 value = entry[1].decode('utf-8', errors='ignore')
                                 
                                 # Map common keys
-                                key_mapping = {
-                                    'ProductName': 'product_name',
-                                    'FileDescription': 'description',
-                                    'FileVersion': 'file_version',
-                                    'ProductVersion': 'product_version',
-                                    'CompanyName': 'company_name',
-                                    'LegalCopyright': 'copyright',
-                                    'InternalName': 'internal_name',
-                                    'OriginalFilename': 'original_filename',
-                                }
-                                
-                                mapped_key = key_mapping.get(key, key.lower().replace(' ', '_'))
+                                mapped_key = _VERSION_KEY_MAPPING.get(key) or key.lower().replace(' ', '_')
                                 version_info[mapped_key] = value
         except Exception as e:
             logger.debug(f"Error extracting version info: {e}")
         
         return version_info
     
-    def _get_imported_dlls(self, pe: 'pefile.PE') -> List[str]:
-        """Extract list of imported DLLs (dependencies)."""
-        imported_dlls = []
-        
+    @staticmethod
+    def _iter_imported_dlls(pe: 'pefile.PE') -> Iterator[str]:
+        """Yield imported DLL names lazily, stopping quietly on a malformed table."""
         try:
-            if hasattr(pe, 'DIRECTORY_ENTRY_IMPORT'):
-                for entry in pe.DIRECTORY_ENTRY_IMPORT:
-                    dll_name = entry.dll.decode('utf-8', errors='ignore')
-                    imported_dlls.append(dll_name)
+            for entry in getattr(pe, 'DIRECTORY_ENTRY_IMPORT', ()):
+                yield entry.dll.rstrip(b'\x00').decode('ascii', 'replace')
         except Exception as e:
             logger.debug(f"Error extracting imported DLLs: {e}")
+    
+    @staticmethod
+    def _get_imported_dlls(pe: 'pefile.PE', limit: Optional[int] = None) -> List[str]:
+        """
+        Extract list of imported DLLs (dependencies).
         
-        return imported_dlls
+        Args:
+            pe: Parsed PE with the import directory loaded
+            limit: Stop after this many names. If None, returns all of them.
+        """
+        return list(itertools.islice(ApplicationAnalyzer._iter_imported_dlls(pe), limit))
     
-    def detect_installer_type(self, exe_path: str) -> str:
+    def detect_installer_type(self, exe_path: str, imported_dlls: Optional[List[str]] = None) -> str:
         """
         Attempt to detect the type of installer.
         
         Args:
             exe_path: Path to the EXE file
+            imported_dlls: The "imported_dlls" of a full analyze() result for this
+                file, if the caller has one; saves parsing the import table again
             
         Returns:
             String indicating installer type (e.g., "NSIS", "Inno Setup", "MSI", "Unknown")
@@ -211,38 +475,58 @@ class ApplicationAnalyzer:
         if not os.path.exists(exe_path):
             raise FileNotFoundError(f"File not found: {exe_path}")
         
-        # Read first few KB to detect signatures
-        with open(exe_path, 'rb') as f:
-            header = f.read(8192)
-        
-        # Check for common installer signatures
-        if b'Nullsoft' in header or b'NSIS' in header:
-            return "NSIS"
-        elif b'Inno Setup' in header or b'InnoSetup' in header:
-            return "Inno Setup"
-        elif b'Wise Installation' in header:
-            return "Wise Installer"
-        elif b'InstallShield' in header:
-            return "InstallShield"
-        elif header[0:2] == b'MZ' and b'This program cannot be run in DOS mode' in header:
+        st = os.stat(exe_path)
+        key = (os.path.abspath(exe_path), st.st_mtime_ns, st.st_size)
+        installer_type = self._cached_installer_type(*key)
+        
+        if installer_type == "PE Executable" and self.pefile_available:
+            try:
+                import_names = imported_dlls
+                if import_names is None:
+                    import_names = self._cached_import_names(*key)
+                
+                # Check for MSI-related imports, stopping at the first hit
+                if any('msi' in dll_name.lower() for dll_name in import_names):
+                    return "MSI-based"
+            except:
+                pass
+        
+        return installer_type
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _cached_installer_type(exe_path: str, mtime_ns: int, size: int) -> str:
+        """Header-based installer type detection, memoized per (path, mtime, size)."""
+        # First few KB are enough to detect signatures
+        header, _ = _read_header(exe_path, 8192)
+        
+        # bytes.__contains__ uses CPython's fast search; an 8 KB header makes a
+        # short ordered scan cheaper than a regex alternation over every match
+        for signature, label in _INSTALLER_SIGNATURES:
+            if signature in header:
+                return label
+        
+        if header.startswith(b'MZ') and b'This program cannot be run in DOS mode' in header:
             # Basic PE executable, could be various types
-            if self.pefile_available:
-                try:
-                    pe = pefile.PE(exe_path)
-                    # Check for MSI-related imports
-                    if hasattr(pe, 'DIRECTORY_ENTRY_IMPORT'):
-                        for entry in pe.DIRECTORY_ENTRY_IMPORT:
-                            dll_name = entry.dll.decode('utf-8', errors='ignore').lower()
-                            if 'msi' in dll_name:
-                                pe.close()
-                                return "MSI-based"
-                    pe.close()
-                except:
-                    pass
             return "PE Executable"
         
         return "Unknown"
     
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _cached_import_names(exe_path: str, mtime_ns: int, size: int) -> tuple:
+        """Imported DLL names, parsed once per (path, mtime, size)."""
+        with _open_mapped(exe_path) as mapped:
+            # Only the import table is needed here
+            pe = _load_pefile().PE(data=mapped, fast_load=True)
+            try:
+                pe.parse_data_directories(directories=[
+                    _IMPORT_DIRECTORY,
+                ])
+                return tuple(ApplicationAnalyzer._get_imported_dlls(pe))
+            finally:
+                pe.close()
+    
     def generate_report(self, analysis_result: Dict[str, any], format: str = "text") -> str:
         """
         Generate a formatted report from analysis results.
@@ -255,65 +539,38 @@ class ApplicationAnalyzer:
             Formatted report string
         """
         if format == "json":
-            import json
-            return json.dumps(analysis_result, indent=2, default=str)
+            return dumps_bytes(analysis_result, indent=True, default=str).decode('utf-8')
         elif format == "yaml":
             import yaml
-            return yaml.dump(analysis_result, default_flow_style=False)
+            # libyaml's emitter when PyYAML was built with it
+            dumper = getattr(yaml, 'CDumper', yaml.Dumper)
+            return yaml.dump(analysis_result, Dumper=dumper, default_flow_style=False)
         else:  # text
             return self._generate_text_report(analysis_result)
     
     def _generate_text_report(self, data: Dict[str, any]) -> str:
         """Generate a human-readable text report."""
-        lines = []
-        lines.append("=" * 70)
-        lines.append("APPLICATION ANALYSIS REPORT")
-        lines.append("=" * 70)
-        lines.append("")
+        lines = [_REPORT_RULE, "APPLICATION ANALYSIS REPORT", _REPORT_RULE, ""]
         
         # Basic information
-        lines.append("BASIC INFORMATION")
-        lines.append("-" * 70)
-        lines.append(f"File Name:     {data.get('file_name', 'N/A')}")
-        lines.append(f"File Path:     {data.get('file_path', 'N/A')}")
-        lines.append(f"File Size:     {data.get('file_size_mb', 0)} MB")
-        lines.append("")
+        lines += _format_section("BASIC INFORMATION", _BASIC_FIELDS, data)
         
         # Version information
         if 'product_name' in data or 'file_version' in data:
-            lines.append("VERSION INFORMATION")
-            lines.append("-" * 70)
-            if 'product_name' in data:
-                lines.append(f"Product Name:  {data['product_name']}")
-            if 'file_version' in data:
-                lines.append(f"File Version:  {data['file_version']}")
-            if 'product_version' in data:
-                lines.append(f"Product Ver:   {data['product_version']}")
-            if 'company_name' in data:
-                lines.append(f"Company:       {data['company_name']}")
-            if 'description' in data:
-                lines.append(f"Description:   {data['description']}")
-            lines.append("")
+            lines += _format_section("VERSION INFORMATION", _VERSION_FIELDS, data)
         
         # Technical information
         if 'machine_type' in data:
-            lines.append("TECHNICAL INFORMATION")
-            lines.append("-" * 70)
-            lines.append(f"Machine Type:  {data['machine_type']}")
-            lines.append(f"64-bit:        {data.get('is_64bit', False)}")
-            if 'subsystem' in data:
-                lines.append(f"Subsystem:     {data['subsystem']}")
-            lines.append("")
+            lines += _format_section("TECHNICAL INFORMATION", _TECH_FIELDS, data)
         
         # Dependencies
-        if 'imported_dlls' in data and data['imported_dlls']:
-            lines.append("DEPENDENCIES (Imported DLLs)")
-            lines.append("-" * 70)
-            for dll in data['imported_dlls'][:20]:  # Limit to first 20
-                lines.append(f"  - {dll}")
-            if len(data['imported_dlls']) > 20:
-                lines.append(f"  ... and {len(data['imported_dlls']) - 20} more")
+        imported_dlls = data.get('imported_dlls')
+        if imported_dlls:
+            lines += ["DEPENDENCIES (Imported DLLs)", _SECTION_RULE]
+            lines += [f"  - {dll}" for dll in imported_dlls[:20]]  # Limit to first 20
+            if len(imported_dlls) > 20:
+                lines.append(f"  ... and {len(imported_dlls) - 20} more")
             lines.append("")
         
-        lines.append("=" * 70)
+        lines.append(_REPORT_RULE)
         return "\n".join(lines)
@@ -12,12 +12,11 @@ import click
 from colorama import init, Fore, Style
 
 from . import __version__
-from .orchestrator import PackageOrchestrator
-from .analyzer import ApplicationAnalyzer
-from .config import ConfigManager
 
-# Initialize colorama for cross-platform colored output
-init(autoreset=True)
+# Initialize colorama for cross-platform colored output. Redirected output is
+# left alone; click.echo strips ANSI codes itself when not writing to a terminal.
+if sys.stdout.isatty():
+    init(autoreset=True)
 
 # Configure logging
 logging.basicConfig(
@@ -26,25 +25,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Message prefixes, built once instead of per call
+_PREFIXES = {
+    'success': f"{Fore.GREEN}✓ ",
+    'error': f"{Fore.RED}✗ ",
+    'warning': f"{Fore.YELLOW}⚠ ",
+    'info': f"{Fore.BLUE}ℹ ",
+}
+_RESET = Style.RESET_ALL
+
 
 def print_success(message: str):
     """Print success message in green."""
-    click.echo(f"{Fore.GREEN}✓ {message}{Style.RESET_ALL}")
+    click.echo(_PREFIXES['success'] + message + _RESET)
 
 
 def print_error(message: str):
     """Print error message in red."""
-    click.echo(f"{Fore.RED}✗ {message}{Style.RESET_ALL}", err=True)
+    click.echo(_PREFIXES['error'] + message + _RESET, err=True)
 
 
 def print_warning(message: str):
     """Print warning message in yellow."""
-    click.echo(f"{Fore.YELLOW}⚠ {message}{Style.RESET_ALL}")
+    click.echo(_PREFIXES['warning'] + message + _RESET)
 
 
 def print_info(message: str):
     """Print info message in blue."""
-    click.echo(f"{Fore.BLUE}ℹ {message}{Style.RESET_ALL}")
+    click.echo(_PREFIXES['info'] + message + _RESET)
 
 
 @click.group()
@@ -86,6 +94,8 @@ def convert(ctx, input_file, output_folder, tool_path, setup_file, catalog, no_a
     try:
         print_info(f"Converting {input_file} to .intunewin format...")
         
+        from .orchestrator import PackageOrchestrator
+        
         # Initialize orchestrator
         orchestrator = PackageOrchestrator(intune_win_tool_path=tool_path)
         
@@ -135,17 +145,27 @@ def convert(ctx, input_file, output_folder, tool_path, setup_file, catalog, no_a
 @click.option('--tool-path', type=click.Path(exists=True),
               help='Path to IntuneWinAppUtil.exe (overrides config)')
 @click.option('--dry-run', is_flag=True, help='Show what would be done without executing')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Number of applications to package in parallel')
+@click.option('--parallelism', type=click.Choice(['threads', 'processes']), default='threads',
+              show_default=True, help='How parallel jobs run (with --jobs > 1)')
+@click.option('--results-file', type=click.Path(dir_okay=False),
+              help='Append full per-application results to this file as JSON lines')
 @click.pass_context
-def batch(ctx, config_file, tool_path, dry_run):
+def batch(ctx, config_file, tool_path, dry_run, jobs, parallelism, results_file):
     """
     Process multiple applications using a configuration file.
     
     Example:
         intune-packager batch -c config.yml
+        intune-packager batch -c config.yml --jobs 4
+        intune-packager batch -c config.yml --jobs 4 --parallelism processes
     """
     try:
         print_info(f"Loading configuration from {config_file}...")
         
+        from .config import ConfigManager
+        
         # Load and parse configuration
         config_manager = ConfigManager()
         raw_config = config_manager.load_config(config_file)
@@ -167,15 +187,24 @@ def batch(ctx, config_file, tool_path, dry_run):
         # Use tool_path from command line or config
         final_tool_path = tool_path or parsed_config.get('intune_win_tool')
         
-        # Initialize orchestrator
-        orchestrator = PackageOrchestrator(intune_win_tool_path=final_tool_path)
+        from .orchestrator import PackageOrchestrator
+        from .analyzer import AnalysisCache, ApplicationAnalyzer
+        
+        # Initialize orchestrator; one cached analyzer is shared by every application
+        orchestrator = PackageOrchestrator(
+            intune_win_tool_path=final_tool_path,
+            analyzer=ApplicationAnalyzer(cache=AnalysisCache())
+        )
         
         # Process batch
         print_info("\nStarting batch processing...")
         results = orchestrator.batch_package(
             applications=parsed_config['applications'],
             default_output_folder=parsed_config.get('default_output_folder'),
-            stop_on_error=parsed_config.get('stop_on_error', False)
+            stop_on_error=parsed_config.get('stop_on_error', False),
+            max_workers=jobs,
+            parallelism=parallelism,
+            results_file=results_file
         )
         
         # Display results
@@ -210,26 +239,31 @@ def batch(ctx, config_file, tool_path, dry_run):
               help='Save analysis report to file')
 @click.option('--format', '-f', type=click.Choice(['text', 'json', 'yaml']), default='text',
               help='Output format')
+@click.option('--quick', is_flag=True,
+              help='Only read PE headers from the start of the file (no imports or sections)')
 @click.pass_context
-def analyze(ctx, input_file, output_file, format):
+def analyze(ctx, input_file, output_file, format, quick):
     """
     Analyze an EXE file and extract metadata.
     
     Example:
         intune-packager analyze -i app.exe
         intune-packager analyze -i app.exe -o report.json -f json
+        intune-packager analyze -i large_setup.exe --quick
     """
     try:
         print_info(f"Analyzing {input_file}...")
         
+        from .analyzer import ApplicationAnalyzer
+        
         # Initialize analyzer
         analyzer = ApplicationAnalyzer()
         
         # Perform analysis
-        analysis_result = analyzer.analyze(input_file)
+        analysis_result = analyzer.analyze(input_file, quick=quick)
         
         # Detect installer type
-        installer_type = analyzer.detect_installer_type(input_file)
+        installer_type = analyzer.detect_installer_type(input_file, analysis_result.get('imported_dlls'))
         analysis_result['installer_type'] = installer_type
         
         # Generate report
@@ -267,6 +301,8 @@ def validate(ctx, tool_path):
     try:
         print_info("Validating setup...")
         
+        from .orchestrator import PackageOrchestrator
+        
         # Initialize orchestrator (this will check for the tool)
         try:
             orchestrator = PackageOrchestrator(intune_win_tool_path=tool_path)
@@ -322,6 +358,8 @@ def init_config(ctx, output_file, format):
     try:
         print_info(f"Generating template configuration...")
         
+        from .config import ConfigManager
+        
         config_manager = ConfigManager()
         template = config_manager.create_template_config(format=format)
         
@@ -3,28 +3,89 @@ Configuration Manager Module
 Handles loading and parsing YAML/JSON configuration files for batch processing.
 """
 
+import io
 import os
+import copy
 import json
+import functools
+import importlib.util
+import time
 import logging
-from typing import Dict, List, Optional, Union
-from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
-try:
-    import yaml
-    YAML_AVAILABLE = True
-except ImportError:
-    YAML_AVAILABLE = False
+from ._json import dumps_bytes, loads as json_loads
+from ._yaml import load_yaml_module
+
+# PyYAML is probed here but only imported when a YAML file is read or written
+YAML_AVAILABLE = importlib.util.find_spec("yaml") is not None
+if not YAML_AVAILABLE:
     logging.warning("PyYAML not available. YAML configuration files cannot be loaded.")
 
 logger = logging.getLogger(__name__)
 
 
+# Example configuration written by create_template_config(); treat as read-only
+_TEMPLATE_CONFIG = {
+    'intune_win_tool': 'C:\\Tools\\IntuneWinAppUtil.exe',
+    'output_directory': 'C:\\IntunePackages',
+    'stop_on_error': False,
+    'applications': [
+        {
+            'name': 'Example Application 1',
+            'source_file': 'C:\\Installers\\app1-setup.exe',
+            'setup_file': 'app1-setup.exe',
+            'install_command': 'app1-setup.exe /silent',
+            'uninstall_command': 'C:\\Program Files\\App1\\uninstall.exe /S',
+            'analyze': True
+        },
+        {
+            'name': 'Example Application 2',
+            'source_folder': 'C:\\Installers\\App2',
+            'setup_file': 'setup.exe',
+            'output_folder': 'C:\\IntunePackages\\App2',
+            'install_command': 'setup.exe /quiet',
+            'uninstall_command': 'msiexec /x {PRODUCT-GUID} /quiet'
+        }
+    ]
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _render_template(format: str) -> str:
+    """Serialize _TEMPLATE_CONFIG once per format."""
+    if format == 'yaml':
+        yaml, _, safe_dumper = load_yaml_module()
+        return yaml.dump(_TEMPLATE_CONFIG, Dumper=safe_dumper, default_flow_style=False, sort_keys=False)
+    return dumps_bytes(_TEMPLATE_CONFIG, indent=True).decode('utf-8')
+
+
+def _resolve_path(path: Optional[str]) -> Optional[str]:
+    """Absolute, normalized form of a configured path (None/empty stays None)."""
+    return os.path.normpath(os.path.abspath(path)) if path else None
+
+
 class ConfigManager:
     """Manages configuration loading and validation for batch processing."""
     
-    def __init__(self):
-        """Initialize the configuration manager."""
+    # File extension -> loader method
+    _LOADERS = {
+        '.yml': '_load_yaml',
+        '.yaml': '_load_yaml',
+        '.json': '_load_json',
+    }
+    
+    def __init__(self, cache_ttl: Optional[float] = None):
+        """
+        Initialize the configuration manager.
+        
+        Args:
+            cache_ttl: Seconds a parsed config stays cached. If None, entries only
+                expire when the file's mtime or size changes.
+        """
         self.yaml_available = YAML_AVAILABLE
+        self.cache_ttl = cache_ttl
+        # abspath -> ((mtime_ns, size), parsed_at, config)
+        self._parse_cache: Dict[str, Tuple[Tuple[int, int], float, Dict]] = {}
     
     def load_config(self, config_path: str) -> Dict:
         """
@@ -40,31 +101,50 @@ class ConfigManager:
             FileNotFoundError: If config file doesn't exist
             ValueError: If config file format is unsupported or invalid
         """
-        if not os.path.exists(config_path):
-            raise FileNotFoundError(f"Configuration file not found: {config_path}")
+        try:
+            st = os.stat(config_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Configuration file not found: {config_path}") from None
+        
+        file_ext = os.path.splitext(config_path)[1].lower()
+        loader_name = self._LOADERS.get(file_ext)
+        if loader_name is None:
+            raise ValueError(f"Unsupported configuration file format: {file_ext}")
         
-        file_ext = Path(config_path).suffix.lower()
+        # Reuse the previous parse while the file is unchanged
+        cache_key = os.path.abspath(config_path)
+        fingerprint = (st.st_mtime_ns, st.st_size)
+        cached = self._parse_cache.get(cache_key)
+        if cached is not None and cached[0] == fingerprint:
+            if self.cache_ttl is None or time.monotonic() - cached[1] < self.cache_ttl:
+                logger.debug(f"Using cached configuration for {config_path}")
+                # Callers may mutate the result; keep the cached copy pristine
+                return copy.deepcopy(cached[2])
         
         logger.info(f"Loading configuration from {config_path}")
         
-        if file_ext in ['.yml', '.yaml']:
-            return self._load_yaml(config_path)
-        elif file_ext == '.json':
-            return self._load_json(config_path)
-        else:
-            raise ValueError(f"Unsupported configuration file format: {file_ext}")
+        config = getattr(self, loader_name)(config_path)
+        
+        self._parse_cache[cache_key] = (fingerprint, time.monotonic(), copy.deepcopy(config))
+        return config
     
     def _load_yaml(self, config_path: str) -> Dict:
         """Load YAML configuration file."""
         if not self.yaml_available:
             raise ValueError("PyYAML library is not available. Cannot load YAML files.")
         
+        yaml, safe_loader, _ = load_yaml_module()
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-                if not isinstance(config, dict):
-                    raise ValueError("Configuration file must contain a dictionary/object")
-                return config
+            # One bulk read; the parser then works from memory and detects the
+            # encoding (UTF-8/UTF-16) from the bytes itself
+            with open(config_path, 'rb') as f:
+                buffer = io.BytesIO(f.read())
+            # Keeps the file name in parser error marks
+            buffer.name = config_path
+            config = yaml.load(buffer, Loader=safe_loader)
+            if not isinstance(config, dict):
+                raise ValueError("Configuration file must contain a dictionary/object")
+            return config
         except yaml.YAMLError as e:
             raise ValueError(f"Invalid YAML format: {e}") from e
         except Exception as e:
@@ -73,12 +153,15 @@ class ConfigManager:
     def _load_json(self, config_path: str) -> Dict:
         """Load JSON configuration file."""
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                if not isinstance(config, dict):
-                    raise ValueError("Configuration file must contain a dictionary/object")
-                return config
+            with open(config_path, 'rb') as f:
+                data = f.read()
+            # Both parsers take the raw bytes, skipping a text-mode decode pass
+            config = json_loads(data)
+            if not isinstance(config, dict):
+                raise ValueError("Configuration file must contain a dictionary/object")
+            return config
         except json.JSONDecodeError as e:
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
             raise ValueError(f"Invalid JSON format: {e}") from e
         except Exception as e:
             raise ValueError(f"Failed to load JSON configuration: {e}") from e
@@ -94,20 +177,42 @@ class ConfigManager:
             Tuple of (is_valid, list_of_errors)
         """
         errors = []
+        for _ in self._iter_validated_apps(config, errors):
+            pass
         
+        is_valid = len(errors) == 0
+        return is_valid, errors
+    
+    def _iter_validated_apps(
+        self,
+        config: Dict,
+        errors: List[str]
+    ) -> Iterator[Tuple[Dict, Optional[str], Optional[str], Optional[str]]]:
+        """
+        Validate the configuration, yielding each application as it is checked.
+        
+        Problems are appended to `errors`; structurally broken entries are not yielded.
+        
+        Args:
+            config: Configuration dictionary to validate
+            errors: List that collects validation messages
+            
+        Yields:
+            Tuples of (app, source_file, source_folder, setup_file)
+        """
         # Check for applications list
         if 'applications' not in config:
             errors.append("Configuration must contain 'applications' key")
-            return False, errors
+            return
         
         applications = config['applications']
         if not isinstance(applications, list):
             errors.append("'applications' must be a list")
-            return False, errors
+            return
         
         if len(applications) == 0:
             errors.append("'applications' list is empty")
-            return False, errors
+            return
         
         # Validate each application
         for i, app in enumerate(applications, 1):
@@ -115,6 +220,10 @@ class ConfigManager:
                 errors.append(f"Application {i}: must be a dictionary")
                 continue
             
+            source_file = app.get('source_file')
+            source_folder = app.get('source_folder')
+            setup_file = app.get('setup_file')
+            
             # Check required fields
             if 'source_file' not in app and 'source_folder' not in app:
                 errors.append(f"Application {i}: must have 'source_file' or 'source_folder'")
@@ -122,9 +231,8 @@ class ConfigManager:
             # If source_folder is specified, setup_file is required
             if 'source_folder' in app and 'setup_file' not in app:
                 errors.append(f"Application {i}: 'setup_file' required when using 'source_folder'")
-        
-        is_valid = len(errors) == 0
-        return is_valid, errors
+            
+            yield app, source_file, source_folder, setup_file
     
     def parse_config_for_batch(self, config: Dict) -> Dict:
         """
@@ -139,25 +247,17 @@ class ConfigManager:
         Raises:
             ValueError: If configuration is invalid
         """
-        is_valid, errors = self.validate_config(config)
-        if not is_valid:
-            error_msg = "Configuration validation failed:\n" + "\n".join(f"  - {e}" for e in errors)
-            raise ValueError(error_msg)
-        
-        # Extract global settings
-        intune_win_tool = config.get('intune_win_tool')
-        default_output_folder = config.get('output_directory') or config.get('output_folder')
-        stop_on_error = config.get('stop_on_error', False)
-        
-        # Process applications
+        # Validate and build in a single pass over the applications
+        errors = []
         applications = []
-        for app in config['applications']:
+        for app, source_file, source_folder, setup_file in self._iter_validated_apps(config, errors):
+            # setup_file stays relative: it names a file inside source_folder
             processed_app = {
-                'source_file': app.get('source_file'),
-                'source_folder': app.get('source_folder'),
-                'setup_file': app.get('setup_file'),
-                'output_folder': app.get('output_folder') or app.get('output_directory'),
-                'catalog_folder': app.get('catalog_folder'),
+                'source_file': _resolve_path(source_file),
+                'source_folder': _resolve_path(source_folder),
+                'setup_file': setup_file,
+                'output_folder': _resolve_path(app.get('output_folder') or app.get('output_directory')),
+                'catalog_folder': _resolve_path(app.get('catalog_folder')),
                 'analyze': app.get('analyze', True),
                 'quiet': app.get('quiet', False),
             }
@@ -172,6 +272,15 @@ class ConfigManager:
             
             applications.append(processed_app)
         
+        if errors:
+            error_msg = "Configuration validation failed:\n" + "\n".join(f"  - {e}" for e in errors)
+            raise ValueError(error_msg)
+        
+        # Extract global settings
+        intune_win_tool = _resolve_path(config.get('intune_win_tool'))
+        default_output_folder = _resolve_path(config.get('output_directory') or config.get('output_folder'))
+        stop_on_error = config.get('stop_on_error', False)
+        
         return {
             'intune_win_tool': intune_win_tool,
             'default_output_folder': default_output_folder,
@@ -195,12 +304,13 @@ class ConfigManager:
             if not self.yaml_available:
                 raise ValueError("PyYAML library is not available. Cannot save YAML files.")
             
+            yaml, _, safe_dumper = load_yaml_module()
             with open(output_path, 'w', encoding='utf-8') as f:
-                yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+                yaml.dump(config, f, Dumper=safe_dumper, default_flow_style=False, sort_keys=False)
             
         elif format == 'json':
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2)
+            with open(output_path, 'wb') as f:
+                f.write(dumps_bytes(config, indent=True))
         
         else:
             raise ValueError(f"Unsupported format: {format}")
@@ -217,35 +327,9 @@ class ConfigManager:
         Returns:
             Template configuration as a string
         """
-        template = {
-            'intune_win_tool': 'C:\\Tools\\IntuneWinAppUtil.exe',
-            'output_directory': 'C:\\IntunePackages',
-            'stop_on_error': False,
-            'applications': [
-                {
-                    'name': 'Example Application 1',
-                    'source_file': 'C:\\Installers\\app1-setup.exe',
-                    'setup_file': 'app1-setup.exe',
-                    'install_command': 'app1-setup.exe /silent',
-                    'uninstall_command': 'C:\\Program Files\\App1\\uninstall.exe /S',
-                    'analyze': True
-                },
-                {
-                    'name': 'Example Application 2',
-                    'source_folder': 'C:\\Installers\\App2',
-                    'setup_file': 'setup.exe',
-                    'output_folder': 'C:\\IntunePackages\\App2',
-                    'install_command': 'setup.exe /quiet',
-                    'uninstall_command': 'msiexec /x {PRODUCT-GUID} /quiet'
-                }
-            ]
-        }
-        
         if format == 'yaml':
             if not self.yaml_available:
                 raise ValueError("PyYAML library is not available.")
-            return yaml.dump(template, default_flow_style=False, sort_keys=False)
-        elif format == 'json':
-            return json.dumps(template, indent=2)
-        else:
+        elif format != 'json':
             raise ValueError(f"Unsupported format: {format}")
+        return _render_template(format)
@@ -4,19 +4,77 @@ Wraps Microsoft Win32 Content Prep Tool functionality for converting application
 """
 
 import os
-import subprocess
-import shutil
-import tempfile
+import sys
+import functools
+import threading
+from collections import deque
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def _which_intune_tool() -> Optional[str]:
+    """PATH lookup for the tool, done once per process."""
+    import shutil
+    return shutil.which("IntuneWinAppUtil.exe")
+
+
+def _tool_popen_kwargs() -> Dict[str, any]:
+    """Extra subprocess arguments for launching IntuneWinAppUtil."""
+    if sys.platform != 'win32':
+        return {}
+    
+    import subprocess
+    # No console window per conversion. close_fds stays at its default (True):
+    # conversions run concurrently, and a child inheriting another conversion's
+    # pipe handles would hold that pipe open past its own tool's exit
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    startupinfo.wShowWindow = subprocess.SW_HIDE
+    return {
+        "creationflags": subprocess.CREATE_NO_WINDOW,
+        "startupinfo": startupinfo,
+    }
+
+
+# Absolute tool paths that passed validation. Failures are not remembered: a
+# timeout on a cold first start (AV scan, slow disk) must not stick for the batch
+_validated_tools = set()
+
+
+def _validate_tool_cached(tool_path: str) -> bool:
+    """Run the tool's help until it succeeds once per absolute tool path."""
+    import subprocess
+    
+    if tool_path in _validated_tools:
+        return True
+    
+    try:
+        result = subprocess.run(
+            [tool_path, "-h"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            **_tool_popen_kwargs()
+        )
+        valid = result.returncode == 0 or "usage" in result.stdout.lower()
+        if valid:
+            _validated_tools.add(tool_path)
+        return valid
+    except Exception as e:
+        logger.error(f"Failed to validate tool: {e}")
+        return False
+
+
 class IntuneWinConverter:
     """Handles conversion of EXE files to .intunewin format using Microsoft Win32 Content Prep Tool."""
     
+    # Lines of tool output kept for the conversion result
+    OUTPUT_TAIL_LINES = 200
+    
     def __init__(self, intune_win_tool_path: Optional[str] = None):
         """
         Initialize the converter.
@@ -43,12 +101,13 @@ class IntuneWinConverter:
             os.path.join(os.path.expanduser("~"), "Downloads", "IntuneWinAppUtil.exe"),
         ]
         
+        # One stat per candidate; listing e.g. ~/Downloads would cost far more
         for path in common_paths:
-            if os.path.exists(path):
+            if os.path.isfile(path):
                 return os.path.abspath(path)
         
         # Try to find in PATH
-        tool_path = shutil.which("IntuneWinAppUtil.exe")
+        tool_path = _which_intune_tool()
         return tool_path if tool_path else None
     
     def convert(
@@ -76,17 +135,19 @@ class IntuneWinConverter:
             ValueError: If parameters are invalid
             RuntimeError: If conversion fails
         """
-        # Validate inputs
-        if not os.path.exists(source_folder):
-            raise ValueError(f"Source folder does not exist: {source_folder}")
-        
+        # Validate inputs; a present setup file implies its folder exists, so the
+        # folder is only checked when working out which one is missing
         setup_file_path = os.path.join(source_folder, setup_file)
         if not os.path.exists(setup_file_path):
+            if not os.path.exists(source_folder):
+                raise ValueError(f"Source folder does not exist: {source_folder}")
             raise ValueError(f"Setup file does not exist: {setup_file_path}")
         
         # Create output folder if it doesn't exist
         os.makedirs(output_folder, exist_ok=True)
         
+        import subprocess
+        
         # Build command
         cmd = [
             self.intune_win_tool_path,
@@ -107,15 +168,9 @@ class IntuneWinConverter:
         
         try:
             # Run the conversion
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            stdout, stderr = self._run_tool(cmd, quiet)
             
             logger.info("Conversion successful")
-            logger.debug(f"Command output: {result.stdout}")
             
             # Find the generated .intunewin file
             intunewin_file = self._find_intunewin_file(output_folder, setup_file)
@@ -124,8 +179,8 @@ class IntuneWinConverter:
                 "status": "success",
                 "output_file": intunewin_file,
                 "output_folder": output_folder,
-                "stdout": result.stdout,
-                "stderr": result.stderr
+                "stdout": stdout,
+                "stderr": stderr
             }
             
         except subprocess.CalledProcessError as e:
@@ -133,6 +188,56 @@ class IntuneWinConverter:
             logger.error(error_msg)
             raise RuntimeError(error_msg) from e
     
+    def _run_tool(self, cmd: list, quiet: bool) -> Tuple[str, str]:
+        """
+        Run IntuneWinAppUtil, streaming its output to the debug log.
+        
+        Args:
+            cmd: Full command line
+            quiet: Discard stdout instead of reading it
+            
+        Returns:
+            Tuple of (last OUTPUT_TAIL_LINES lines of stdout, stderr)
+            
+        Raises:
+            subprocess.CalledProcessError: If the tool exits with a non-zero status
+        """
+        import subprocess
+        
+        if quiet:
+            result = subprocess.run(
+                cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, **_tool_popen_kwargs()
+            )
+            if result.returncode != 0:
+                raise subprocess.CalledProcessError(result.returncode, cmd, stderr=result.stderr)
+            return "", result.stderr
+        
+        tail = deque(maxlen=self.OUTPUT_TAIL_LINES)
+        with subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1,
+            **_tool_popen_kwargs()
+        ) as process:
+            # Drain stderr on a side thread so neither pipe can fill up and block the tool
+            stderr_parts = []
+            stderr_reader = threading.Thread(
+                target=lambda: stderr_parts.append(process.stderr.read()), daemon=True
+            )
+            stderr_reader.start()
+            
+            for line in process.stdout:
+                line = line.rstrip()
+                logger.debug(f"IntuneWinAppUtil: {line}")
+                tail.append(line)
+            
+            stderr_reader.join()
+            returncode = process.wait()
+        
+        stdout = "\n".join(tail)
+        stderr = "".join(stderr_parts)
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd, output=stdout, stderr=stderr)
+        return stdout, stderr
+    
     def _find_intunewin_file(self, output_folder: str, setup_file: str) -> Optional[str]:
         """Find the generated .intunewin file in the output folder."""
         # The tool typically names the file as <setup_file_without_extension>.intunewin
@@ -142,12 +247,17 @@ class IntuneWinConverter:
         if os.path.exists(expected_file):
             return expected_file
         
-        # Search for any .intunewin file in the output folder
-        for file in os.listdir(output_folder):
-            if file.endswith(".intunewin"):
-                return os.path.join(output_folder, file)
+        # Otherwise take the newest .intunewin in the output folder; the folder may
+        # hold packages from earlier runs, so the first listed one can be stale
+        newest_path, newest_mtime = None, None
+        with os.scandir(output_folder) as entries:
+            for entry in entries:
+                if entry.name.endswith(".intunewin") and entry.is_file():
+                    mtime = entry.stat().st_mtime_ns
+                    if newest_mtime is None or mtime > newest_mtime:
+                        newest_path, newest_mtime = entry.path, mtime
         
-        return None
+        return newest_path
     
     def convert_with_temp_folder(
         self,
@@ -172,13 +282,15 @@ class IntuneWinConverter:
         if not os.path.exists(source_file):
             raise ValueError(f"Source file does not exist: {source_file}")
         
+        import tempfile
+        
         # Create temporary folder
         with tempfile.TemporaryDirectory() as temp_dir:
-            # Copy source file to temp directory
+            # Stage source file in temp directory (the tool only reads it)
             temp_file = os.path.join(temp_dir, os.path.basename(source_file))
-            shutil.copy2(source_file, temp_file)
+            method = self._stage_file(source_file, temp_file)
             
-            logger.info(f"Copied {source_file} to temporary folder {temp_dir}")
+            logger.info(f"Staged {source_file} in temporary folder {temp_dir} ({method})")
             
             # Convert
             return self.convert(
@@ -188,21 +300,42 @@ class IntuneWinConverter:
                 quiet=quiet
             )
     
+    @staticmethod
+    def _stage_file(source_file: str, dest_file: str) -> str:
+        """
+        Make source_file available at dest_file without copying bytes when possible.
+        
+        Tries a hardlink, then a symlink, then falls back to a full copy.
+        
+        Returns:
+            The method used: "hardlink", "symlink" or "copy"
+        """
+        # os.link is CreateHardLinkW on Windows; it fails across volumes
+        try:
+            os.link(source_file, dest_file)
+            return "hardlink"
+        except (OSError, NotImplementedError) as e:
+            logger.debug(f"Hardlink not possible: {e}")
+        
+        # Symlinks need Developer Mode or SeCreateSymbolicLinkPrivilege on Windows
+        try:
+            os.symlink(os.path.abspath(source_file), dest_file)
+            return "symlink"
+        except (OSError, NotImplementedError) as e:
+            logger.debug(f"Symlink not possible: {e}")
+        
+        import shutil
+        shutil.copy2(source_file, dest_file)
+        return "copy"
+    
     def validate_tool(self) -> bool:
         """
         Validate that the IntuneWinAppUtil tool is accessible and working.
         
+        A successful check is remembered per tool path for the process;
+        a failed one is retried on the next call.
+        
         Returns:
             True if tool is valid, False otherwise
         """
-        try:
-            result = subprocess.run(
-                [self.intune_win_tool_path, "-h"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.returncode == 0 or "usage" in result.stdout.lower()
-        except Exception as e:
-            logger.error(f"Failed to validate tool: {e}")
-            return False
+        return _validate_tool_cached(os.path.abspath(self.intune_win_tool_path))
@@ -4,16 +4,53 @@ Automatically analyzes installer folders and suggests package configuration.
 Uses heuristic rules (no AI) to detect structure.
 """
 
+import io
 import os
+import re
+import sys
+import errno
 import logging
+import functools
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .models.app_profile import _slots_dataclass
 
 logger = logging.getLogger(__name__)
 
+# statx(2) arguments from <fcntl.h>/<linux/stat.h>; only the size is requested
+_AT_FDCWD = -100
+_AT_STATX_DONT_SYNC = 0x4000
+_STATX_SIZE = 0x200
+_STATX_STRUCT_SIZE = 256
+_STATX_SIZE_OFFSET = 40  # struct statx.stx_size
+
+
+@functools.lru_cache(maxsize=None)
+def _load_statx():
+    """
+    Look up libc's statx() on Linux.
+    
+    Returns:
+        ctypes function, or None where statx isn't available (non-Linux, glibc < 2.28)
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    import ctypes
+    try:
+        statx = ctypes.CDLL(None, use_errno=True).statx
+    except (OSError, AttributeError):
+        return None
+    # No argtypes: every argument is a plain int/bytes/byref, and skipping the
+    # per-call conversion keeps the ctypes overhead close to os.stat's
+    statx.restype = ctypes.c_int
+    return statx
+
 
-@dataclass
+@_slots_dataclass
 class AnalyzedFile:
     """Represents an analyzed file in the package."""
     path: Path
@@ -25,7 +62,7 @@ class AnalyzedFile:
     metadata: Dict = field(default_factory=dict)
 
 
-@dataclass
+@_slots_dataclass
 class FolderAnalysisResult:
     """Result of folder analysis."""
     main_installer: Optional[AnalyzedFile] = None
@@ -68,8 +105,54 @@ class FolderAnalyzer:
     # Known helper tools
     HELPER_TOOLS = ['getip', 'username', 'sysinfo', 'regutil']
     
-    def __init__(self):
-        """Initialize folder analyzer."""
+    # Archive extensions
+    ARCHIVE_EXTENSIONS = ['.zip', '.rar', '.7z', '.tar', '.gz']
+    
+    # Name keywords of a large .exe that is an installer, and of the main installer
+    INSTALLER_KEYWORDS = ['install', 'setup', 'deploy']
+    MAIN_INSTALLER_KEYWORDS = ['install', 'setup']
+    
+    # Hashed extension sets and one-pass pattern matchers built from the lists above
+    _CONFIG_EXTS = frozenset(CONFIG_EXTENSIONS)
+    _SCRIPT_EXTS = frozenset(SCRIPT_EXTENSIONS)
+    _ARCHIVE_EXTS = frozenset(ARCHIVE_EXTENSIONS)
+    _LICENSE_RE = re.compile('|'.join(map(re.escape, LICENSE_PATTERNS)))
+    _DATABASE_RE = re.compile('|'.join(map(re.escape, DATABASE_PATTERNS)))
+    _HELPER_RE = re.compile('|'.join(map(re.escape, HELPER_TOOLS)))
+    _INSTALL_RE = re.compile('|'.join(map(re.escape, INSTALLER_KEYWORDS)))
+    _MAIN_INSTALL_RE = re.compile('|'.join(map(re.escape, MAIN_INSTALLER_KEYWORDS)))
+    
+    # AnalyzedFile.type -> _classify_files() bucket; anything else is 'unknown'
+    _TYPE_BUCKETS = {
+        'installer': 'installers',
+        'executable': 'executables',
+        'config': 'configs',
+        'script': 'scripts',
+        'archive': 'archives',
+        'license': 'licenses',
+    }
+    _BUCKETS = (*_TYPE_BUCKETS.values(), 'unknown')
+    
+    # Directories with more files than this have their stat calls spread over
+    # the scan thread pool in batches of STAT_BATCH_SIZE
+    BULK_STAT_THRESHOLD = 512
+    STAT_BATCH_SIZE = 256
+    
+    # Directories that never hold anything worth classifying; they (and any
+    # dot-directory) are pruned before their contents are listed
+    IGNORED_DIRS = frozenset({
+        '__MACOSX', '.git', '.svn', 'node_modules', '$RECYCLE.BIN', 'System Volume Information'
+    })
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize folder analyzer.
+        
+        Args:
+            max_workers: Threads used to list directories. If None, uses
+                min(32, 4 * CPU count) since listing is I/O-bound.
+        """
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
         logger.info("FolderAnalyzer initialized")
     
     def analyze_folder(self, folder_path: str) -> FolderAnalysisResult:
@@ -82,16 +165,24 @@ class FolderAnalyzer:
         Returns:
             FolderAnalysisResult with detected components
         """
-        folder = Path(folder_path)
-        if not folder.exists() or not folder.is_dir():
+        folder = os.fspath(folder_path)
+        if not os.path.isdir(folder):
             raise ValueError(f"Folder not found or not a directory: {folder_path}")
         
         logger.info(f"Analyzing folder: {folder_path}")
         
         result = FolderAnalysisResult()
         
-        # Scan all files
-        all_files = self._scan_files(folder)
+        # Scan all files, unless the top level already settles the question
+        root_listing = self._list_directory(folder)
+        if self._is_single_msi_package(root_listing):
+            files, unstatted, subdirs = root_listing
+            all_files = files + self._stat_entries(unstatted)
+            logger.info(
+                f"Single MSI at top level; not scanning {len(subdirs)} subfolder(s) of payload"
+            )
+        else:
+            all_files = list(self._scan_files(folder, root_listing))
         logger.info(f"Found {len(all_files)} files")
         
         # Classify files
@@ -118,65 +209,183 @@ class FolderAnalyzer:
         
         # Calculate confidence and generate suggestions
         result.confidence_score = self._calculate_confidence(result)
-        result.warnings = self._generate_warnings(result)
-        result.suggestions = self._generate_suggestions(result)
+        result.warnings, result.suggestions = self._finalize(result)
         
         logger.info(f"Analysis complete. Confidence: {result.confidence_score:.2f}")
         
         return result
     
-    def _scan_files(self, folder: Path) -> List[Path]:
-        """Recursively scan all files in folder."""
-        files = []
-        for root, dirs, filenames in os.walk(folder):
-            for filename in filenames:
-                file_path = Path(root) / filename
-                # Skip hidden files and Mac metadata
-                if not filename.startswith('.') and filename != 'Thumbs.db':
-                    files.append(file_path)
-        return files
+    @staticmethod
+    def _is_single_msi_package(listing: Tuple) -> bool:
+        """
+        Whether a top-level listing is a plain MSI package.
+        
+        Exactly one .msi and no .exe at the top level means the MSI is the
+        main installer; any subfolders next to it hold its payload (e.g. an
+        administrative install point), so they don't need classifying.
+        """
+        files, unstatted, _ = listing
+        msi_count = 0
+        for entry in unstatted or (entry for entry, _ in files):
+            ext = entry.name[-4:].lower()
+            if ext == '.exe':
+                return False
+            if ext == '.msi':
+                msi_count += 1
+        return msi_count == 1
     
-    def _classify_files(self, files: List[Path]) -> Dict[str, List[AnalyzedFile]]:
-        """Classify files into categories."""
-        classified = {
-            'installers': [],
-            'executables': [],
-            'configs': [],
-            'scripts': [],
-            'archives': [],
-            'licenses': [],
-            'unknown': []
-        }
-        
-        for file_path in files:
-            analyzed = self._analyze_file(file_path)
-            
-            if analyzed.type == 'installer':
-                classified['installers'].append(analyzed)
-            elif analyzed.type == 'executable':
-                classified['executables'].append(analyzed)
-            elif analyzed.type == 'config':
-                classified['configs'].append(analyzed)
-            elif analyzed.type == 'script':
-                classified['scripts'].append(analyzed)
-            elif analyzed.type == 'archive':
-                classified['archives'].append(analyzed)
-            elif analyzed.type == 'license':
-                classified['licenses'].append(analyzed)
+    def _scan_files(
+        self,
+        folder: str,
+        root_listing: Optional[Tuple] = None
+    ) -> Iterator[Tuple[os.DirEntry, int]]:
+        """
+        Recursively scan all files in folder.
+        
+        Directory listings run on a thread pool so their latency overlaps (this
+        matters most on network shares), while results are still yielded in the
+        same top-down order as os.walk. The stat calls of very large directories
+        are split into batches across the pool as well.
+        
+        Args:
+            folder: Folder to scan
+            root_listing: _list_directory() result for folder, if already listed
+        
+        Yields:
+            Tuples of (directory entry, size in bytes) for each file
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            listing = root_listing or self._list_directory(folder)
+            stack = []
+            while True:
+                files, unstatted, subdirs = listing
+                
+                # Queue every subdirectory listing now; consume them depth-first
+                stack.extend(reversed([
+                    executor.submit(self._list_directory, subdir) for subdir in subdirs
+                ]))
+                
+                yield from files
+                if unstatted:
+                    batches = [
+                        unstatted[start:start + self.STAT_BATCH_SIZE]
+                        for start in range(0, len(unstatted), self.STAT_BATCH_SIZE)
+                    ]
+                    for batch in executor.map(self._stat_entries, batches):
+                        yield from batch
+                
+                if not stack:
+                    break
+                listing = stack.pop().result()
+    
+    def _list_directory(
+        self,
+        directory: str
+    ) -> Tuple[List[Tuple[os.DirEntry, int]], List[os.DirEntry], List[str]]:
+        """
+        List one directory, reusing each DirEntry's type information.
+        
+        Returns:
+            Tuple of (file entries with their sizes, file entries left for
+            batched stat-ing when the directory is large, subdirectory paths),
+            all in listing order
+        """
+        file_entries = []
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        # Like os.walk, don't descend into symlinked directories
+                        name = entry.name
+                        if not (entry.is_symlink() or name in self.IGNORED_DIRS
+                                or name.startswith('.')):
+                            subdirs.append(entry.path)
+                        continue
+                    
+                    # Skip hidden files and Mac metadata
+                    if entry.name.startswith('.') or entry.name == 'Thumbs.db':
+                        continue
+                    
+                    file_entries.append(entry)
+        except OSError as e:
+            # os.walk silently skips directories it cannot list
+            logger.debug(f"Skipping unreadable directory: {e}")
+        
+        if len(file_entries) > self.BULK_STAT_THRESHOLD:
+            return [], file_entries, subdirs
+        return self._stat_entries(file_entries), [], subdirs
+    
+    @staticmethod
+    def _stat_entries(entries: List[os.DirEntry]) -> List[Tuple[os.DirEntry, int]]:
+        """
+        Get the sizes of a batch of file entries.
+        
+        On Linux this asks statx() for the size alone, without forcing a sync
+        with the server on network mounts; elsewhere DirEntry.stat() is used
+        (on Windows it is served from the directory listing). Entries that
+        vanished or are unreadable are skipped.
+        """
+        results = []
+        statx = _load_statx()
+        if statx is not None:
+            import ctypes
+            buf = ctypes.create_string_buffer(_STATX_STRUCT_SIZE)
+            buf_ref = ctypes.byref(buf)
+            stx_size = ctypes.c_uint64.from_buffer(buf, _STATX_SIZE_OFFSET)
+            for index, entry in enumerate(entries):
+                path = os.fsencode(entry.path)
+                if statx(_AT_FDCWD, path, _AT_STATX_DONT_SYNC, _STATX_SIZE, buf_ref) == 0:
+                    results.append((entry, stx_size.value))
+                    continue
+                
+                err = ctypes.get_errno()
+                if err in (errno.ENOSYS, errno.EPERM):
+                    # Kernel older than 4.11 (or a seccomp filter): stat the rest instead
+                    entries = entries[index:]
+                    break
+                logger.debug(f"Skipping unreadable file {entry.path}: {os.strerror(err)}")
             else:
-                classified['unknown'].append(analyzed)
+                return results
+        
+        for entry in entries:
+            try:
+                results.append((entry, entry.stat().st_size))
+            except OSError as e:
+                logger.debug(f"Skipping unreadable file {entry.path}: {e}")
+        return results
+    
+    def _classify_files(
+        self,
+        files: List[Tuple[os.DirEntry, int]]
+    ) -> Dict[str, List[AnalyzedFile]]:
+        """Classify files into categories."""
+        classified = {bucket: [] for bucket in self._BUCKETS}
+        type_buckets = self._TYPE_BUCKETS
+        
+        for entry, size in files:
+            analyzed = self._analyze_file(entry.path, entry.name, size)
+            classified[type_buckets.get(analyzed.type, 'unknown')].append(analyzed)
         
         return classified
     
-    def _analyze_file(self, file_path: Path) -> AnalyzedFile:
-        """Analyze a single file."""
-        name = file_path.name.lower()
-        size = file_path.stat().st_size
-        ext = file_path.suffix.lower()
+    def _analyze_file(self, path: str, file_name: str, size: int) -> AnalyzedFile:
+        """
+        Analyze a single file.
+        
+        Args:
+            path: Full path to the file
+            file_name: File name as found on disk
+            size: File size in bytes (from the scan, so no extra stat)
+        """
+        # Lower-case once; every check below works on these two strings
+        name = file_name.lower()
+        dot = name.rfind('.')
+        ext = name[dot:] if dot > 0 else ''
         
         analyzed = AnalyzedFile(
-            path=file_path,
-            name=file_path.name,
+            path=Path(path),
+            name=file_name,
             size=size,
             type='unknown',
             confidence=0.5,
@@ -186,26 +395,26 @@ class FolderAnalyzer:
         # Detect file type based on extension and name patterns
         
         # Scripts
-        if ext in self.SCRIPT_EXTENSIONS:
+        if ext in self._SCRIPT_EXTS:
             analyzed.type = 'script'
             analyzed.confidence = 0.9
             analyzed.suggested_purpose = 'Installation script or helper'
             return analyzed
         
         # Config files
-        if ext in self.CONFIG_EXTENSIONS:
+        if ext in self._CONFIG_EXTS:
             analyzed.type = 'config'
             analyzed.confidence = 0.9
             analyzed.suggested_purpose = 'Configuration file'
             return analyzed
         
         # Archives
-        if ext in ['.zip', '.rar', '.7z', '.tar', '.gz']:
+        if ext in self._ARCHIVE_EXTS:
             analyzed.type = 'archive'
             analyzed.confidence = 0.9
             
             # Check if it's license-related
-            if any(pattern in name for pattern in self.LICENSE_PATTERNS):
+            if self._LICENSE_RE.search(name):
                 analyzed.type = 'license'
                 analyzed.suggested_purpose = 'License/dongle drivers'
             else:
@@ -228,14 +437,14 @@ class FolderAnalyzer:
             # For now, use heuristics based on name and size
             
             # Large exe with "install", "setup" in name = likely installer
-            if any(keyword in name for keyword in ['install', 'setup', 'deploy']) and size > 1_000_000:
+            if size > 1_000_000 and self._INSTALL_RE.search(name):
                 analyzed.type = 'installer'
                 analyzed.confidence = 0.8
                 analyzed.suggested_purpose = 'Main installer'
                 return analyzed
             
             # Database patterns
-            if any(db in name for db in self.DATABASE_PATTERNS):
+            if self._DATABASE_RE.search(name):
                 analyzed.type = 'installer'
                 analyzed.confidence = 0.85
                 analyzed.suggested_purpose = 'Database installer (dependency)'
@@ -243,7 +452,7 @@ class FolderAnalyzer:
                 return analyzed
             
             # Helper tools
-            if any(tool in name for tool in self.HELPER_TOOLS):
+            if self._HELPER_RE.search(name):
                 analyzed.type = 'executable'
                 analyzed.confidence = 0.7
                 analyzed.suggested_purpose = 'Helper utility'
@@ -277,10 +486,10 @@ class FolderAnalyzer:
             return None
         
         # Rule 1: Largest installer is usually the main one
-        main = max(installers, key=lambda x: x.size)
+        main = max(installers, key=attrgetter('size'))
         
         # Rule 2: Boost confidence if name contains "install" or "setup"
-        if any(keyword in main.name.lower() for keyword in ['install', 'setup']):
+        if self._MAIN_INSTALL_RE.search(main.name.lower()):
             main.confidence = min(main.confidence + 0.15, 1.0)
         
         main.suggested_purpose = 'Main installer'
@@ -298,9 +507,11 @@ class FolderAnalyzer:
             return installers
         
         dependencies = []
+        # Kept in scan order (not by size): the draft installs dependencies in this order
+        likely_dependency_size = main_installer.size * 0.3
         
         for installer in installers:
-            if installer == main_installer:
+            if installer is main_installer:
                 continue
             
             # Database installers are dependencies
@@ -308,7 +519,7 @@ class FolderAnalyzer:
                 installer.suggested_purpose = 'Dependency installer'
                 dependencies.append(installer)
             # Smaller installers are likely dependencies
-            elif installer.size < main_installer.size * 0.3:
+            elif installer.size < likely_dependency_size:
                 installer.suggested_purpose = 'Dependency installer (likely)'
                 installer.confidence = 0.7
                 dependencies.append(installer)
@@ -334,36 +545,63 @@ class FolderAnalyzer:
     
     def _calculate_confidence(self, result: FolderAnalysisResult) -> float:
         """Calculate overall confidence score."""
-        scores = []
+        total = 0.0
+        count = 0
         
         if result.main_installer:
-            scores.append(result.main_installer.confidence)
+            total += result.main_installer.confidence
+            count += 1
         
-        if result.dependencies:
-            scores.extend([d.confidence for d in result.dependencies])
+        for dep in result.dependencies:
+            total += dep.confidence
+            count += 1
         
-        if result.standalone_executables:
-            scores.extend([s.confidence for s in result.standalone_executables])
+        for exe in result.standalone_executables:
+            total += exe.confidence
+            count += 1
         
-        return sum(scores) / len(scores) if scores else 0.5
+        return total / count if count else 0.5
     
-    def _generate_warnings(self, result: FolderAnalysisResult) -> List[str]:
-        """Generate warnings about potential issues."""
+    def _finalize(self, result: FolderAnalysisResult) -> Tuple[List[str], List[str]]:
+        """
+        Generate warnings about potential issues and suggestions for the user.
+        
+        Returns:
+            Tuple of (warnings, suggestions)
+        """
         warnings = []
+        suggestions = []
+        standalone = result.standalone_executables
+        dependency_count = len(result.dependencies)
         
-        if not result.main_installer:
+        if result.main_installer:
+            suggestions.append(
+                f"Main installer detected: {result.main_installer.name}. "
+                "Test silent install arguments."
+            )
+        else:
             warnings.append("No main installer detected. Manual configuration required.")
         
-        if result.standalone_executables:
+        if standalone:
             warnings.append(
-                f"Found {len(result.standalone_executables)} standalone executable(s). "
+                f"Found {len(standalone)} standalone executable(s). "
                 "These may need to be copied after installation."
             )
         
-        if len(result.dependencies) > 1:
-            warnings.append(
-                f"Found {len(result.dependencies)} dependencies. "
-                "Verify installation order."
+        if dependency_count:
+            if dependency_count > 1:
+                warnings.append(
+                    f"Found {dependency_count} dependencies. "
+                    "Verify installation order."
+                )
+            suggestions.append(
+                "Install dependencies before main application for best results."
+            )
+        
+        if standalone:
+            suggestions.extend(
+                f"Consider adding post-install file replacement for: {exe.name}"
+                for exe in standalone
             )
         
         if result.confidence_score < 0.6:
@@ -371,29 +609,6 @@ class FolderAnalyzer:
                 "Low confidence in analysis. Please review and adjust configuration manually."
             )
         
-        return warnings
-    
-    def _generate_suggestions(self, result: FolderAnalysisResult) -> List[str]:
-        """Generate suggestions for user."""
-        suggestions = []
-        
-        if result.main_installer:
-            suggestions.append(
-                f"Main installer detected: {result.main_installer.name}. "
-                "Test silent install arguments."
-            )
-        
-        if result.dependencies:
-            suggestions.append(
-                "Install dependencies before main application for best results."
-            )
-        
-        if result.standalone_executables:
-            for exe in result.standalone_executables:
-                suggestions.append(
-                    f"Consider adding post-install file replacement for: {exe.name}"
-                )
-        
         if result.scripts:
             suggestions.append(
                 f"Found {len(result.scripts)} script(s). "
@@ -406,58 +621,70 @@ class FolderAnalyzer:
                 "Consider copying these after installation."
             )
         
-        return suggestions
+        return warnings, suggestions
     
     def generate_yaml_draft(self, result: FolderAnalysisResult, app_name: str) -> str:
         """Generate draft YAML configuration from analysis."""
-        lines = []
-        
-        lines.append(f"application:")
-        lines.append(f"  name: \"{app_name}\"")
-        lines.append(f"  version: \"1.0.0\"  # TODO: Update version")
-        lines.append(f"  publisher: \"Unknown\"  # TODO: Update publisher")
-        lines.append(f"")
-        
-        lines.append(f"installers:")
+        # Hand-written rather than yaml.safe_dump so the TODO comments survive
+        buf = io.StringIO()
+        write = buf.write
+        
+        write(
+            f"application:\n"
+            f"  name: \"{app_name}\"\n"
+            f"  version: \"1.0.0\"  # TODO: Update version\n"
+            f"  publisher: \"Unknown\"  # TODO: Update publisher\n"
+            f"\n"
+            f"installers:\n"
+        )
         
         # Add dependencies first
         for dep in result.dependencies:
-            lines.append(f"  - name: \"{dep.name}\"")
-            lines.append(f"    file: \"{dep.name}\"")
-            lines.append(f"    silent_args: \"\"  # TODO: Add silent install arguments")
-            lines.append(f"    optional: false")
-            lines.append(f"")
+            write(
+                f"  - name: \"{dep.name}\"\n"
+                f"    file: \"{dep.name}\"\n"
+                f"    silent_args: \"\"  # TODO: Add silent install arguments\n"
+                f"    optional: false\n"
+                f"\n"
+            )
         
         # Add main installer
         if result.main_installer:
-            lines.append(f"  - name: \"{result.main_installer.name}\"")
-            lines.append(f"    file: \"{result.main_installer.name}\"")
-            lines.append(f"    silent_args: \"\"  # TODO: Add silent install arguments")
+            write(
+                f"  - name: \"{result.main_installer.name}\"\n"
+                f"    file: \"{result.main_installer.name}\"\n"
+                f"    silent_args: \"\"  # TODO: Add silent install arguments\n"
+            )
             
             if result.dependencies:
-                dep_names = [f'"{dep.name}"' for dep in result.dependencies]
-                lines.append(f"    depends_on: [{', '.join(dep_names)}]")
+                dep_names = ', '.join(f'"{dep.name}"' for dep in result.dependencies)
+                write(f"    depends_on: [{dep_names}]\n")
             
-            lines.append(f"")
+            write("\n")
         
         # Add post-install section if standalone executables found
         if result.standalone_executables:
-            lines.append(f"post_install:")
-            lines.append(f"  file_replacements:")
+            write("post_install:\n  file_replacements:\n")
             for exe in result.standalone_executables:
-                lines.append(f"    - source: \"{exe.name}\"")
-                lines.append(f"      destination: \"\"  # TODO: Specify destination path")
-                lines.append(f"      backup: true")
-            lines.append(f"")
+                write(
+                    f"    - source: \"{exe.name}\"\n"
+                    f"      destination: \"\"  # TODO: Specify destination path\n"
+                    f"      backup: true\n"
+                )
+            write("\n")
         
         # Add config files section
         if result.config_files:
             if not result.standalone_executables:
-                lines.append(f"post_install:")
-            lines.append(f"  file_copies:")
+                write("post_install:\n")
+            write("  file_copies:\n")
             for cfg in result.config_files:
-                lines.append(f"    - source: \"{cfg.name}\"")
-                lines.append(f"      destination: \"\"  # TODO: Specify destination path")
-            lines.append(f"")
+                write(
+                    f"    - source: \"{cfg.name}\"\n"
+                    f"      destination: \"\"  # TODO: Specify destination path\n"
+                )
+            write("\n")
         
-        return "\n".join(lines)
+        # Every line above is newline-terminated; drop the last one so the
+        # draft ends exactly as before
+        return buf.getvalue()[:-1]
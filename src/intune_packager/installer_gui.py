@@ -8,18 +8,17 @@ import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
+import queue
 from pathlib import Path
-import yaml
 
-try:
-    from intune_packager.models import ApplicationProfile
-    from intune_packager.script_generator import ScriptGenerator
-except ImportError:
-    # If running as standalone, these will be bundled
-    pass
+# ApplicationProfile, ScriptGenerator (and with them PyYAML and Jinja2) are
+# imported when scripts are generated, so opening the window doesn't pay for them
 
 
 class InstallerGUI:
+    # How often queued log messages are flushed into the log widget
+    LOG_FLUSH_MS = 50
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Intune App Packager - Setup")
@@ -29,7 +28,11 @@ class InstallerGUI:
         self.config_file = tk.StringVar()
         self.output_dir = tk.StringVar(value=str(Path.home() / "IntunePackages"))
         
+        # Filled by log() from any thread, emptied on the Tk thread by _drain_log()
+        self._log_queue = queue.Queue()
+        
         self.create_widgets()
+        self.root.after(self.LOG_FLUSH_MS, self._drain_log)
     
     def create_widgets(self):
         """Create GUI widgets."""
@@ -184,10 +187,23 @@ class InstallerGUI:
         ).pack(side=tk.RIGHT, padx=5)
     
     def log(self, message):
-        """Add message to log."""
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.root.update()
+        """Add message to log (safe to call from worker threads)."""
+        self._log_queue.put(message)
+    
+    def _drain_log(self):
+        """Write all queued log messages to the widget in one insert."""
+        messages = []
+        try:
+            while True:
+                messages.append(self._log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        
+        if messages:
+            self.log_text.insert(tk.END, "".join(message + "\n" for message in messages))
+            self.log_text.see(tk.END)
+        
+        self.root.after(self.LOG_FLUSH_MS, self._drain_log)
     
     def copy_logs(self):
         """Copy all logs to clipboard."""
@@ -287,14 +303,17 @@ class InstallerGUI:
             self.log(f"Output: {output_path}")
             self.log("")
             
+            from intune_packager.models import ApplicationProfile
+            from intune_packager.script_generator import DEFAULT_BYTECODE_CACHE_DIR, ScriptGenerator
+            
             # Load configuration
             self.log("Loading configuration...")
-            with open(config_path, 'r') as f:
-                config_data = yaml.safe_load(f)
+            with open(config_path, 'rb') as f:
+                config_bytes = f.read()
             
             # Create profile
             self.log("Creating application profile...")
-            profile = ApplicationProfile.from_dict(config_data)
+            profile = ApplicationProfile.from_yaml_bytes(config_bytes)
             self.log(f"  Application: {profile.name} v{profile.version}")
             self.log(f"  Publisher: {profile.publisher}")
             self.log(f"  Installers: {len(profile.installers)}")
@@ -302,7 +321,7 @@ class InstallerGUI:
             
             # Generate scripts
             self.log("Generating PowerShell scripts...")
-            generator = ScriptGenerator()
+            generator = ScriptGenerator(bytecode_cache_dir=DEFAULT_BYTECODE_CACHE_DIR)
             scripts = generator.generate_all_scripts(profile)
             
             # Save scripts
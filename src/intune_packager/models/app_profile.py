@@ -3,12 +3,55 @@ Application Profile Models
 Data structures for application configuration and metadata.
 """
 
+import sys
+import functools
+import dataclasses
 from dataclasses import dataclass, field
-from typing import List, Optional, Literal, Dict, Any
+from types import MappingProxyType
+from typing import List, Optional, Literal, Dict, Any, Tuple
 from datetime import datetime
 
+from .._json import dumps_bytes
+from .._yaml import load_yaml_module
 
-@dataclass
+
+# Read-only stand-in for absent config sections, so lookups don't allocate a dict
+_NO_DATA = MappingProxyType({})
+
+_DEFAULT_INSTALL_COMMAND = "powershell.exe -ExecutionPolicy Bypass -File install.ps1"
+_DEFAULT_UNINSTALL_COMMAND = "powershell.exe -ExecutionPolicy Bypass -File uninstall.ps1"
+
+
+def _intern(value):
+    """sys.intern() enum-like strings; other values (None, YAML scalars) pass through."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _add_slots(cls):
+    """Rebuild a dataclass with __slots__ (what dataclass(slots=True) does on 3.10+)."""
+    field_names = tuple(f.name for f in dataclasses.fields(cls))
+    cls_dict = dict(cls.__dict__)
+    cls_dict['__slots__'] = field_names
+    # Field defaults live on the class and would clash with the slot descriptors
+    for name in field_names:
+        cls_dict.pop(name, None)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    slotted = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    slotted.__qualname__ = cls.__qualname__
+    return slotted
+
+
+# Profiles are built in bulk for batch runs: slots drop the per-instance
+# __dict__ and make attribute access a fixed-offset lookup
+if sys.version_info >= (3, 10):
+    _slots_dataclass = functools.partial(dataclass, slots=True)
+else:
+    def _slots_dataclass(cls):
+        return _add_slots(dataclass(cls))
+
+
+@_slots_dataclass
 class Installer:
     """Represents a single installer in a package."""
     name: str
@@ -33,7 +76,7 @@ class Installer:
         }
 
 
-@dataclass
+@_slots_dataclass
 class DetectionRule:
     """Represents a detection rule for the application."""
     type: Literal["file", "registry", "process", "script"]
@@ -54,6 +97,12 @@ class DetectionRule:
     # Script-specific fields
     script_content: Optional[str] = None
     
+    def __post_init__(self):
+        # Enum-like values repeat across every rule of a batch
+        self.type = _intern(self.type)
+        self.hive = _intern(self.hive)
+        self.operator = _intern(self.operator)
+    
     def to_dict(self) -> Dict[str, Any]:
         result = {'type': self.type}
         if self.path:
@@ -78,7 +127,7 @@ class DetectionRule:
         return result
 
 
-@dataclass
+@_slots_dataclass
 class UninstallStrategy:
     """Defines how the application should be uninstalled."""
     strategy: Literal["standard", "force", "multi"] = "multi"
@@ -94,6 +143,10 @@ class UninstallStrategy:
     remove_paths: List[str] = field(default_factory=list)
     remove_registry: List[str] = field(default_factory=list)
     
+    def __post_init__(self):
+        self.strategy = _intern(self.strategy)
+        self.method = _intern(self.method)
+    
     def to_dict(self) -> Dict[str, Any]:
         return {
             'strategy': self.strategy,
@@ -107,7 +160,7 @@ class UninstallStrategy:
         }
 
 
-@dataclass
+@_slots_dataclass
 class FileReplacement:
     """Defines a file to replace after installation."""
     source: str  # File in package folder
@@ -124,7 +177,7 @@ class FileReplacement:
         }
 
 
-@dataclass
+@_slots_dataclass
 class FileCopy:
     """Defines a file to copy after installation."""
     source: str
@@ -139,7 +192,7 @@ class FileCopy:
         }
 
 
-@dataclass
+@_slots_dataclass
 class PostInstallOperations:
     """Post-installation operations."""
     file_replacements: List[FileReplacement] = field(default_factory=list)
@@ -152,7 +205,7 @@ class PostInstallOperations:
         }
 
 
-@dataclass
+@_slots_dataclass
 class Shortcut:
     """Defines a shortcut to create."""
     name: str
@@ -177,7 +230,7 @@ class Shortcut:
         return result
 
 
-@dataclass
+@_slots_dataclass
 class Assignment:
     """Defines an Intune assignment."""
     intent: Literal["available", "required", "uninstall"]
@@ -187,6 +240,9 @@ class Assignment:
     restart_grace_period_minutes: Optional[int] = None
     available_in_company_portal: bool = True
     
+    def __post_init__(self):
+        self.intent = _intern(self.intent)
+    
     def to_dict(self) -> Dict[str, Any]:
         result = {
             'intent': self.intent,
@@ -201,7 +257,7 @@ class Assignment:
         return result
 
 
-@dataclass
+@_slots_dataclass
 class CompanyPortalMetadata:
     """Company Portal display information."""
     description: str = ""
@@ -224,7 +280,7 @@ class CompanyPortalMetadata:
         }
 
 
-@dataclass
+@_slots_dataclass
 class IntuneRequirements:
     """System requirements for the application."""
     minimum_os: str = "1809"  # Windows 10 version
@@ -232,6 +288,9 @@ class IntuneRequirements:
     minimum_disk_space_mb: int = 100
     minimum_memory_mb: int = 512
     
+    def __post_init__(self):
+        self.architecture = _intern(self.architecture)
+    
     def to_dict(self) -> Dict[str, Any]:
         return {
             'minimum_os': self.minimum_os,
@@ -241,11 +300,11 @@ class IntuneRequirements:
         }
 
 
-@dataclass
+@_slots_dataclass
 class IntuneSettings:
     """Intune-specific settings."""
-    install_command: str = "powershell.exe -ExecutionPolicy Bypass -File install.ps1"
-    uninstall_command: str = "powershell.exe -ExecutionPolicy Bypass -File uninstall.ps1"
+    install_command: str = _DEFAULT_INSTALL_COMMAND
+    uninstall_command: str = _DEFAULT_UNINSTALL_COMMAND
     install_time_minutes: int = 15
     allow_available_uninstall: bool = True
     requirements: IntuneRequirements = field(default_factory=IntuneRequirements)
@@ -260,7 +319,7 @@ class IntuneSettings:
         }
 
 
-@dataclass
+@_slots_dataclass
 class TestingConfig:
     """Testing configuration."""
     sandbox_enabled: bool = True
@@ -281,7 +340,7 @@ class TestingConfig:
         }
 
 
-@dataclass
+@_slots_dataclass
 class ApplicationProfile:
     """Complete application profile for packaging and deployment."""
     # Basic metadata
@@ -324,6 +383,9 @@ class ApplicationProfile:
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     
+    def __post_init__(self):
+        self.detection_method = _intern(self.detection_method)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert profile to dictionary for serialization."""
         return {
@@ -352,32 +414,51 @@ class ApplicationProfile:
             'testing': self.testing.to_dict()
         }
     
+    def to_json_bytes(self) -> bytes:
+        """
+        Serialize the profile to compact UTF-8 JSON (same schema as to_dict()).
+        
+        Uses orjson when installed. Values YAML parsed into types JSON lacks
+        (e.g. dates) are written as str().
+        """
+        return dumps_bytes(self.to_dict(), default=str)
+    
+    @classmethod
+    def from_yaml_bytes(cls, data: bytes) -> 'ApplicationProfile':
+        """
+        Create profile from the raw bytes of a YAML configuration.
+        
+        Parsed with libyaml's CSafeLoader when PyYAML was built against libyaml
+        (the PyPI wheels are; source builds need the libyaml headers), and with
+        the pure-Python SafeLoader otherwise. Passing bytes lets the parser
+        detect the encoding (UTF-8/UTF-16, BOM) itself.
+        """
+        yaml, safe_loader, _ = load_yaml_module()
+        return cls.from_dict(yaml.load(data, Loader=safe_loader))
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ApplicationProfile':
         """Create profile from dictionary."""
-        app = data.get('application', {})
+        app = data.get('application') or _NO_DATA
+        detection = data.get('detection') or _NO_DATA
+        shortcuts_data = data.get('shortcuts') or _NO_DATA
+        intune_data = data.get('intune') or _NO_DATA
         
-        # Parse installers
-        installers = [
-            Installer(**inst) for inst in data.get('installers', [])
-        ]
-        
-        # Parse detection rules
-        detection = data.get('detection', {})
-        detection_rules = [
-            DetectionRule(**rule) for rule in detection.get('rules', [])
-        ]
+        # Parse list sections (installers, detection rules, shortcuts)
+        sections = {
+            attr: [ctor(**item) for item in _extract(data, path)]
+            for attr, path, ctor in _LIST_SECTIONS
+        }
         
         # Parse uninstall strategy
-        uninstall_data = data.get('uninstall', {})
+        uninstall_data = data.get('uninstall')
         if uninstall_data:
             # Flatten nested structure from YAML
-            strategy = uninstall_data.get('strategy', 'multi')
-            standard_data = uninstall_data.get('standard', {})
-            force_data = uninstall_data.get('force', {})
+            standard_data = uninstall_data.get('standard') or _NO_DATA
+            force_data = uninstall_data.get('force') or _NO_DATA
             
             uninstall = UninstallStrategy(
-                strategy=strategy,
+                strategy=uninstall_data.get('strategy', 'multi'),
                 method=standard_data.get('method', 'registry'),
                 command=standard_data.get('command'),
                 wait=standard_data.get('wait', True),
@@ -389,46 +470,35 @@ class ApplicationProfile:
         else:
             uninstall = UninstallStrategy()
         
-        # Parse shortcuts
-        shortcuts_data = data.get('shortcuts', {})
-        shortcuts = [
-            Shortcut(**sc) for sc in shortcuts_data.get('locations', [])
-        ]
-        
         # Parse Intune settings
-        intune_data = data.get('intune', {})
         if intune_data:
             # Parse nested requirements
-            req_data = intune_data.get('requirements', {})
+            req_data = intune_data.get('requirements')
             requirements = IntuneRequirements(**req_data) if req_data else IntuneRequirements()
             
-            # Parse assignments from intune.assignments
-            intune_assignments = intune_data.get('assignments', [])
-            
             intune = IntuneSettings(
-                install_command=intune_data.get('install_command', 'powershell.exe -ExecutionPolicy Bypass -File install.ps1'),
-                uninstall_command=intune_data.get('uninstall_command', 'powershell.exe -ExecutionPolicy Bypass -File uninstall.ps1'),
+                install_command=intune_data.get('install_command', _DEFAULT_INSTALL_COMMAND),
+                uninstall_command=intune_data.get('uninstall_command', _DEFAULT_UNINSTALL_COMMAND),
                 install_time_minutes=intune_data.get('install_time_minutes', 15),
                 allow_available_uninstall=intune_data.get('allow_available_uninstall', True),
                 requirements=requirements
             )
         else:
-            intune_assignments = []
             intune = IntuneSettings()
         
-        # Parse assignments (combine root level and intune level)
-        root_assignments = data.get('assignments', [])
-        all_assignments = root_assignments + intune_assignments
+        # Parse assignments (root level first, then intune.assignments)
         assignments = [
-            Assignment(**assign) for assign in all_assignments
+            Assignment(**assign)
+            for path in _ASSIGNMENT_PATHS
+            for assign in _extract(data, path)
         ]
         
         # Parse Company Portal metadata
-        cp_data = data.get('company_portal', {})
+        cp_data = data.get('company_portal')
         company_portal = CompanyPortalMetadata(**cp_data) if cp_data else CompanyPortalMetadata()
         
         # Parse testing config
-        test_data = data.get('testing', {})
+        test_data = data.get('testing')
         testing = TestingConfig(**test_data) if test_data else TestingConfig()
         
         return cls(
@@ -436,17 +506,33 @@ class ApplicationProfile:
             version=app.get('version', ''),
             publisher=app.get('publisher', ''),
             description=app.get('description', ''),
-            installers=installers,
             detection_method=detection.get('method', 'comprehensive'),
-            detection_rules=detection_rules,
             custom_detection_script=detection.get('custom_script'),
             uninstall=uninstall,
-            shortcuts=shortcuts,
             auto_create_shortcuts=shortcuts_data.get('auto_create', True),
             intune=intune,
             assignments=assignments,
             dependencies=data.get('dependencies', []),
             supersedes=data.get('supersedence', []),
             company_portal=company_portal,
-            testing=testing
+            testing=testing,
+            **sections
         )
+
+
+def _extract(data: Dict[str, Any], path: Tuple[str, ...]) -> List[Any]:
+    """Follow nested keys through data; a missing or empty section yields ()."""
+    for key in path:
+        data = data.get(key)
+        if not data:
+            return ()
+    return data
+
+
+# (ApplicationProfile field, key path in the config dict, item type) for list sections
+_LIST_SECTIONS = (
+    ('installers', ('installers',), Installer),
+    ('detection_rules', ('detection', 'rules'), DetectionRule),
+    ('shortcuts', ('shortcuts', 'locations'), Shortcut),
+)
+_ASSIGNMENT_PATHS = (('assignments',), ('intune', 'assignments'))
@@ -4,30 +4,79 @@ Coordinates the complete conversion process from EXE input to .intunewin output.
 """
 
 import os
+import queue
 import logging
-from typing import Dict, Optional
+import threading
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from typing import BinaryIO, Dict, Literal, Optional, Tuple
 from pathlib import Path
 
+from ._json import dumps_bytes
 from .analyzer import ApplicationAnalyzer
 from .converter import IntuneWinConverter
 
 logger = logging.getLogger(__name__)
 
+# Fields of a batch entry kept in memory when full results are streamed to a file
+_SUMMARY_KEYS = ("index", "status", "source_file", "output_file", "error")
+
+# Marks the end of the entries handed over by _prefetch_analyses
+_END_OF_BATCH = object()
+
+# Orchestrator of a batch worker process (see batch_package(parallelism="processes"))
+_worker_orchestrator = None
+
+
+def _init_batch_worker(intune_win_tool_path: str) -> None:
+    """Process pool initializer: one orchestrator per worker process."""
+    global _worker_orchestrator
+    _worker_orchestrator = PackageOrchestrator(intune_win_tool_path=intune_win_tool_path)
+
+
+def _package_batch_item_in_worker(
+    i: int,
+    app: Dict,
+    default_output_folder: Optional[str],
+    total: int
+) -> Tuple[Dict[str, any], str]:
+    """Process pool task: package one batch entry with the worker's orchestrator."""
+    return _worker_orchestrator._package_batch_item(i, app, default_output_folder, total)
+
 
 class PackageOrchestrator:
     """Orchestrates the complete application packaging workflow."""
     
-    def __init__(self, intune_win_tool_path: Optional[str] = None):
+    def __init__(
+        self,
+        intune_win_tool_path: Optional[str] = None,
+        analyzer: Optional[ApplicationAnalyzer] = None
+    ):
         """
         Initialize the orchestrator.
         
         Args:
             intune_win_tool_path: Path to IntuneWinAppUtil.exe
+            analyzer: Analyzer to share across packaging runs. If None, creates one without a cache.
         """
-        self.analyzer = ApplicationAnalyzer()
+        self.analyzer = analyzer or ApplicationAnalyzer()
         self.converter = IntuneWinConverter(intune_win_tool_path)
         logger.info("PackageOrchestrator initialized")
     
+    def _analyze_installer(self, path: str) -> Tuple[Dict[str, any], str]:
+        """
+        Analyze a file and detect its installer type.
+        
+        Args:
+            path: File to analyze
+        
+        Returns:
+            Tuple of (analysis result, installer type)
+        """
+        analysis = self.analyzer.analyze(path)
+        installer_type = self.analyzer.detect_installer_type(path, analysis.get("imported_dlls"))
+        return analysis, installer_type
+    
     def package_application(
         self,
         source_file: str,
@@ -54,7 +103,7 @@ class PackageOrchestrator:
         if not os.path.exists(source_file):
             raise FileNotFoundError(f"Source file not found: {source_file}")
         
-        logger.info(f"Starting packaging workflow for: {source_file}")
+        logger.info("Starting packaging workflow for: %s", source_file)
         
         result = {
             "source_file": source_file,
@@ -66,16 +115,13 @@ class PackageOrchestrator:
         if analyze:
             logger.info("Step 1: Analyzing application")
             try:
-                analysis = self.analyzer.analyze(source_file)
+                analysis, installer_type = self._analyze_installer(source_file)
                 result["analysis"] = analysis
-                
-                # Detect installer type
-                installer_type = self.analyzer.detect_installer_type(source_file)
                 result["installer_type"] = installer_type
-                logger.info(f"Detected installer type: {installer_type}")
+                logger.info("Detected installer type: %s", installer_type)
                 
             except Exception as e:
-                logger.warning(f"Analysis failed, continuing with conversion: {e}")
+                logger.warning("Analysis failed, continuing with conversion: %s", e)
                 result["analysis_error"] = str(e)
         
         # Step 2: Conversion
@@ -90,7 +136,7 @@ class PackageOrchestrator:
             result["output_file"] = conversion_result.get("output_file")
             result["status"] = "success"
             
-            logger.info(f"Packaging completed successfully: {conversion_result.get('output_file')}")
+            logger.info("Packaging completed successfully: %s", conversion_result.get('output_file'))
             
         except Exception as e:
             error_msg = f"Conversion failed: {e}"
@@ -130,7 +176,7 @@ class PackageOrchestrator:
         if not os.path.exists(setup_file_path):
             raise FileNotFoundError(f"Setup file not found: {setup_file_path}")
         
-        logger.info(f"Starting packaging workflow for folder: {source_folder}")
+        logger.info("Starting packaging workflow for folder: %s", source_folder)
         
         result = {
             "source_folder": source_folder,
@@ -143,14 +189,12 @@ class PackageOrchestrator:
         if analyze:
             logger.info("Analyzing application")
             try:
-                analysis = self.analyzer.analyze(setup_file_path)
+                analysis, installer_type = self._analyze_installer(setup_file_path)
                 result["analysis"] = analysis
-                
-                installer_type = self.analyzer.detect_installer_type(setup_file_path)
                 result["installer_type"] = installer_type
                 
             except Exception as e:
-                logger.warning(f"Analysis failed: {e}")
+                logger.warning("Analysis failed: %s", e)
                 result["analysis_error"] = str(e)
         
         # Conversion
@@ -167,7 +211,7 @@ class PackageOrchestrator:
             result["output_file"] = conversion_result.get("output_file")
             result["status"] = "success"
             
-            logger.info(f"Packaging completed: {conversion_result.get('output_file')}")
+            logger.info("Packaging completed: %s", conversion_result.get('output_file'))
             
         except Exception as e:
             error_msg = f"Conversion failed: {e}"
@@ -182,7 +226,10 @@ class PackageOrchestrator:
         self,
         applications: list,
         default_output_folder: Optional[str] = None,
-        stop_on_error: bool = False
+        stop_on_error: bool = False,
+        max_workers: int = 1,
+        parallelism: Literal["none", "threads", "processes"] = "threads",
+        results_file: Optional[str] = None
     ) -> Dict[str, any]:
         """
         Package multiple applications in batch.
@@ -191,86 +238,237 @@ class PackageOrchestrator:
             applications: List of application dictionaries with 'source_file' and optional 'output_folder'
             default_output_folder: Default output folder if not specified per application
             stop_on_error: Whether to stop processing on first error
+            max_workers: Number of applications to package concurrently (1 = sequential)
+            parallelism: How max_workers > 1 runs applications: "threads" (overlaps
+                IntuneWinAppUtil runs, which release the GIL; shares this
+                orchestrator's analyzer), "processes" (also runs PE analysis in
+                parallel; workers use their own analyzer without its cache), or
+                "none" to stay sequential
+            results_file: Append each application's full result to this file as
+                one JSON line (NDJSON), and keep only its index, status, source,
+                output file and error in the returned "applications" list
             
         Returns:
             Dictionary with batch results
         """
-        logger.info(f"Starting batch packaging of {len(applications)} applications")
+        if parallelism not in ("none", "threads", "processes"):
+            raise ValueError(f"Unknown parallelism: {parallelism}")
+        
+        total = len(applications)
+        logger.info("Starting batch packaging of %d applications", total)
         
         results = {
-            "total": len(applications),
+            "total": total,
             "successful": 0,
             "failed": 0,
             "applications": []
         }
         
-        for i, app in enumerate(applications, 1):
-            source_file = app.get("source_file")
-            output_folder = app.get("output_folder", default_output_folder)
-            
-            if not source_file:
-                logger.error(f"Application {i}: No source_file specified, skipping")
-                results["applications"].append({
-                    "index": i,
-                    "status": "skipped",
-                    "error": "No source_file specified"
-                })
-                results["failed"] += 1
-                continue
-            
-            if not output_folder:
-                logger.error(f"Application {i}: No output_folder specified, skipping")
-                results["applications"].append({
-                    "index": i,
-                    "source_file": source_file,
-                    "status": "skipped",
-                    "error": "No output_folder specified"
-                })
-                results["failed"] += 1
-                continue
-            
-            logger.info(f"Processing application {i}/{len(applications)}: {source_file}")
-            
-            try:
-                # Check if it's a folder or file conversion
-                if "source_folder" in app:
-                    result = self.package_from_folder(
-                        source_folder=app["source_folder"],
-                        setup_file=app.get("setup_file", os.path.basename(source_file)),
-                        output_folder=output_folder,
-                        catalog_folder=app.get("catalog_folder"),
-                        analyze=app.get("analyze", True),
-                        quiet=app.get("quiet", False)
+        outcomes = []
+        # Full per-application results go to the NDJSON file as they finish;
+        # only compact summaries stay in memory
+        results_cm = open(results_file, 'ab') if results_file else contextlib.nullcontext()
+        with results_cm as results_fp:
+            if max_workers <= 1 or parallelism == "none":
+                stop = threading.Event()
+                if self.analyzer.cache is not None:
+                    # Analyze application N+1 while IntuneWinAppUtil packages application N,
+                    # so its cache entry is warm by the time it is packaged
+                    ready = queue.Queue(maxsize=1)
+                    producer = threading.Thread(
+                        target=self._prefetch_analyses, args=(applications, ready, stop), daemon=True
                     )
+                    producer.start()
+                    pending = iter(ready.get, _END_OF_BATCH)
                 else:
-                    result = self.package_application(
-                        source_file=source_file,
-                        output_folder=output_folder,
-                        analyze=app.get("analyze", True),
-                        quiet=app.get("quiet", False)
+                    pending = iter(applications)
+                
+                try:
+                    for i, app in enumerate(pending, 1):
+                        outcome = self._package_batch_item(i, app, default_output_folder, total)
+                        outcomes.append(self._record_outcome(outcome, results_fp))
+                        
+                        if outcome[1] == "failed" and stop_on_error:
+                            logger.error("Stopping batch processing due to error")
+                            break
+                finally:
+                    stop.set()
+            else:
+                # Analysis and IntuneWinAppUtil runs are independent per application
+                if parallelism == "processes":
+                    executor = ProcessPoolExecutor(
+                        max_workers=min(max_workers, total or 1),
+                        initializer=_init_batch_worker,
+                        initargs=(self.converter.intune_win_tool_path,)
                     )
+                    package_item = _package_batch_item_in_worker
+                else:
+                    executor = ThreadPoolExecutor(max_workers=max_workers)
+                    package_item = self._package_batch_item
                 
-                result["index"] = i
-                results["applications"].append(result)
+                with executor:
+                    futures = [
+                        executor.submit(package_item, i, app, default_output_folder, total)
+                        for i, app in enumerate(applications, 1)
+                    ]
+                    collected = set()
+                    for future in as_completed(futures):
+                        collected.add(future)
+                        outcome = future.result()
+                        outcomes.append(self._record_outcome(outcome, results_fp))
+                        
+                        if outcome[1] == "failed" and stop_on_error:
+                            logger.error("Stopping batch processing due to error")
+                            for pending in futures:
+                                pending.cancel()
+                            # Entries already running can't be cancelled and still write
+                            # their packages, so record how they ended as well
+                            running = [f for f in futures if f not in collected and not f.cancelled()]
+                            for finished in wait(running).done:
+                                outcomes.append(self._record_outcome(finished.result(), results_fp))
+                            break
+                # Report in input order regardless of completion order
+                outcomes.sort(key=lambda outcome: outcome[0]["index"])
+        
+        for entry, status in outcomes:
+            results["applications"].append(entry)
+            if status == "success":
                 results["successful"] += 1
-                
-            except Exception as e:
-                logger.error(f"Application {i} failed: {e}")
-                results["applications"].append({
-                    "index": i,
-                    "source_file": source_file,
-                    "status": "failed",
-                    "error": str(e)
-                })
+            else:
                 results["failed"] += 1
-                
-                if stop_on_error:
-                    logger.error("Stopping batch processing due to error")
-                    break
         
-        logger.info(f"Batch packaging completed: {results['successful']} successful, {results['failed']} failed")
+        logger.info(
+            "Batch packaging completed: %d successful, %d failed",
+            results['successful'], results['failed']
+        )
         return results
     
+    @staticmethod
+    def _record_outcome(
+        outcome: Tuple[Dict[str, any], str],
+        results_fp: Optional[BinaryIO]
+    ) -> Tuple[Dict[str, any], str]:
+        """Write a finished entry to the results file, if any, and return what to keep in memory."""
+        if results_fp is None:
+            return outcome
+        
+        entry, status = outcome
+        results_fp.write(dumps_bytes(entry, default=str) + b"\n")
+        
+        summary = {key: entry[key] for key in _SUMMARY_KEYS if key in entry}
+        return summary, status
+    
+    def _prefetch_analyses(self, applications: list, ready: queue.Queue, stop: threading.Event) -> None:
+        """
+        Producer for pipelined batches: warm the analysis cache, then hand each entry on.
+        
+        Args:
+            applications: Batch entries in processing order
+            ready: Bounded queue the packaging loop consumes from
+            stop: Set by the consumer when it stops early
+        """
+        try:
+            for app in applications:
+                if stop.is_set():
+                    return
+                
+                try:
+                    source_file = app.get("source_file")
+                    if source_file and app.get("analyze", True):
+                        source_folder = app.get("source_folder")
+                        if source_folder:
+                            target = os.path.join(
+                                source_folder, app.get("setup_file", os.path.basename(source_file))
+                            )
+                        else:
+                            target = source_file
+                        self._analyze_installer(target)
+                except Exception as e:
+                    # The packaging step re-runs analysis and reports the error
+                    logger.debug("Prefetch analysis failed for %s: %s", app, e)
+                
+                self._hand_off(ready, app, stop)
+        finally:
+            # Always end the stream, so the consumer never waits on a dead producer
+            self._hand_off(ready, _END_OF_BATCH, stop)
+    
+    @staticmethod
+    def _hand_off(ready: queue.Queue, item: object, stop: threading.Event) -> None:
+        """Put item on the bounded queue, giving up once the consumer has stopped."""
+        while not stop.is_set():
+            try:
+                ready.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    
+    def _package_batch_item(
+        self,
+        i: int,
+        app: Dict,
+        default_output_folder: Optional[str],
+        total: int
+    ) -> Tuple[Dict[str, any], str]:
+        """
+        Package a single batch entry.
+        
+        Returns:
+            Tuple of (result entry, status) where status is "success", "skipped" or "failed"
+        """
+        source_file = app.get("source_file")
+        output_folder = app.get("output_folder", default_output_folder)
+        
+        if not source_file:
+            logger.error("Application %d: No source_file specified, skipping", i)
+            return {
+                "index": i,
+                "status": "skipped",
+                "error": "No source_file specified"
+            }, "skipped"
+        
+        if not output_folder:
+            logger.error("Application %d: No output_folder specified, skipping", i)
+            return {
+                "index": i,
+                "source_file": source_file,
+                "status": "skipped",
+                "error": "No output_folder specified"
+            }, "skipped"
+        
+        logger.info("Processing application %d/%d: %s", i, total, source_file)
+        
+        try:
+            # Check if it's a folder or file conversion
+            source_folder = app.get("source_folder")
+            if source_folder:
+                result = self.package_from_folder(
+                    source_folder=source_folder,
+                    setup_file=app.get("setup_file", os.path.basename(source_file)),
+                    output_folder=output_folder,
+                    catalog_folder=app.get("catalog_folder"),
+                    analyze=app.get("analyze", True),
+                    quiet=app.get("quiet", False)
+                )
+            else:
+                result = self.package_application(
+                    source_file=source_file,
+                    output_folder=output_folder,
+                    analyze=app.get("analyze", True),
+                    quiet=app.get("quiet", False)
+                )
+            
+            result["index"] = i
+            return result, "success"
+            
+        except Exception as e:
+            logger.error("Application %d failed: %s", i, e)
+            return {
+                "index": i,
+                "source_file": source_file,
+                "status": "failed",
+                "error": str(e)
+            }, "failed"
+    
     def validate_setup(self) -> Dict[str, bool]:
         """
         Validate that all required tools and dependencies are available.
@@ -287,7 +485,7 @@ class PackageOrchestrator:
         try:
             validation["intune_win_tool"] = self.converter.validate_tool()
         except Exception as e:
-            logger.error(f"Failed to validate IntuneWinAppUtil: {e}")
+            logger.error("Failed to validate IntuneWinAppUtil: %s", e)
         
         all_valid = all(validation.values())
         validation["all_valid"] = all_valid
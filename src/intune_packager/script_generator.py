@@ -4,25 +4,40 @@ Generates PowerShell install/uninstall/detection scripts from templates.
 """
 
 import os
+import hashlib
 import logging
 from pathlib import Path
-from typing import Dict, Optional
-from jinja2 import Environment, FileSystemLoader, Template
+from typing import Dict, List, Optional
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, Template
 
 from .models.app_profile import ApplicationProfile
 
 logger = logging.getLogger(__name__)
 
+# Suggested location for compiled template bytecode (pass as bytecode_cache_dir)
+DEFAULT_BYTECODE_CACHE_DIR = Path.home() / ".intune_packager" / "template_cache"
+
+# Templates used for each generated script (multi_installer works for a single installer too)
+INSTALL_TEMPLATE = "install/multi_installer.ps1"
+UNINSTALL_TEMPLATE = "uninstall/multi_strategy.ps1"
+DETECTION_TEMPLATE = "detection/comprehensive.ps1"
+
 
 class ScriptGenerator:
     """Generates PowerShell scripts from templates using application profiles."""
     
-    def __init__(self, templates_dir: Optional[str] = None):
+    # Rendered script sets kept for profiles generated more than once
+    SCRIPT_CACHE_SIZE = 64
+    
+    def __init__(self, templates_dir: Optional[str] = None, bytecode_cache_dir: Optional[str] = None):
         """
         Initialize the script generator.
         
         Args:
             templates_dir: Path to templates directory. If None, uses default location.
+            bytecode_cache_dir: Directory for compiled template bytecode, created if
+                missing (e.g. DEFAULT_BYTECODE_CACHE_DIR). If None, templates are
+                compiled in memory only and nothing is written to disk.
         """
         if templates_dir is None:
             # Default to templates/ in project root
@@ -34,16 +49,50 @@ class ScriptGenerator:
         if not self.templates_dir.exists():
             raise FileNotFoundError(f"Templates directory not found: {self.templates_dir}")
         
+        # With a cache directory, compiled templates are kept on disk so later runs skip parsing
+        bytecode_cache = None
+        if bytecode_cache_dir is not None:
+            try:
+                cache_dir = Path(bytecode_cache_dir)
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+            except OSError as e:
+                logger.debug(f"Template bytecode cache disabled: {e}")
+        
         # Set up Jinja2 environment
         self.env = Environment(
             loader=FileSystemLoader(str(self.templates_dir)),
             trim_blocks=True,
             lstrip_blocks=True,
-            keep_trailing_newline=True
+            keep_trailing_newline=True,
+            auto_reload=False,
+            bytecode_cache=bytecode_cache
         )
         
+        # Templates are static for the life of the generator; resolve them once
+        self._install_template = self.env.get_template(INSTALL_TEMPLATE)
+        self._uninstall_template = self.env.get_template(UNINSTALL_TEMPLATE)
+        self._detection_template = self.env.get_template(DETECTION_TEMPLATE)
+        
+        # Rendered scripts keyed by profile content hash
+        self._script_cache: Dict[str, Dict[str, str]] = {}
+        
         logger.info(f"ScriptGenerator initialized with templates from: {self.templates_dir}")
     
+    def warm_cache(self) -> int:
+        """
+        Compile every PowerShell template so its bytecode lands in the cache.
+        
+        Returns:
+            Number of templates compiled
+        """
+        template_names = self.env.list_templates(extensions=['ps1'])
+        for template_name in template_names:
+            self.env.get_template(template_name)
+        
+        logger.info(f"Warmed template cache with {len(template_names)} templates")
+        return len(template_names)
+    
     def generate_install_script(self, profile: ApplicationProfile) -> str:
         """
         Generate install.ps1 script from application profile.
@@ -54,15 +103,45 @@ class ScriptGenerator:
         Returns:
             Generated PowerShell script content
         """
-        logger.info(f"Generating install script for {profile.name} v{profile.version}")
+        return self._render_install(profile, self._detection_rule_dicts(profile), self._shortcut_dicts(profile))
+    
+    def generate_uninstall_script(self, profile: ApplicationProfile) -> str:
+        """
+        Generate uninstall.ps1 script from application profile.
         
-        # Determine template based on installer count
-        if len(profile.installers) > 1:
-            template_name = "install/multi_installer.ps1"
-        else:
-            template_name = "install/multi_installer.ps1"  # Use same template, works for single too
+        Args:
+            profile: Application profile containing uninstall configuration
+            
+        Returns:
+            Generated PowerShell script content
+        """
+        return self._render_uninstall(profile, self._detection_rule_dicts(profile), self._shortcut_dicts(profile))
+    
+    def generate_detection_script(self, profile: ApplicationProfile) -> str:
+        """
+        Generate detection.ps1 script from application profile.
         
-        template = self.env.get_template(template_name)
+        Args:
+            profile: Application profile containing detection rules
+            
+        Returns:
+            Generated PowerShell script content
+        """
+        return self._render_detection(profile, self._detection_rule_dicts(profile))
+    
+    @staticmethod
+    def _detection_rule_dicts(profile: ApplicationProfile) -> List[Dict]:
+        return [rule.to_dict() for rule in profile.detection_rules]
+    
+    @staticmethod
+    def _shortcut_dicts(profile: ApplicationProfile) -> List[Dict]:
+        return [sc.to_dict() for sc in profile.shortcuts]
+    
+    # The _render_* helpers take the detection rule and shortcut dicts precomputed,
+    # so generate_all_scripts builds them once for all three scripts
+    
+    def _render_install(self, profile: ApplicationProfile, detection_rules: List[Dict], shortcuts: List[Dict]) -> str:
+        logger.info(f"Generating install script for {profile.name} v{profile.version}")
         
         # Prepare template variables
         context = {
@@ -70,74 +149,48 @@ class ScriptGenerator:
             'app_version': profile.version,
             'publisher': profile.publisher,
             'installers': [inst.to_dict() for inst in profile.installers],
-            'detection_rules': [rule.to_dict() for rule in profile.detection_rules],
-            'shortcuts': [sc.to_dict() for sc in profile.shortcuts] if profile.auto_create_shortcuts else []
+            'detection_rules': detection_rules,
+            'shortcuts': shortcuts if profile.auto_create_shortcuts else []
         }
         
-        script = template.render(**context)
+        script = self._install_template.render(context)
         logger.info(f"Install script generated successfully ({len(script)} characters)")
         
         return script
     
-    def generate_uninstall_script(self, profile: ApplicationProfile) -> str:
-        """
-        Generate uninstall.ps1 script from application profile.
-        
-        Args:
-            profile: Application profile containing uninstall configuration
-            
-        Returns:
-            Generated PowerShell script content
-        """
+    def _render_uninstall(self, profile: ApplicationProfile, detection_rules: List[Dict], shortcuts: List[Dict]) -> str:
         logger.info(f"Generating uninstall script for {profile.name} v{profile.version}")
         
-        # Use multi-strategy template
-        template_name = "uninstall/multi_strategy.ps1"
-        template = self.env.get_template(template_name)
-        
         # Prepare template variables
         context = {
             'app_name': profile.name,
             'app_version': profile.version,
             'publisher': profile.publisher,
-            'detection_rules': [rule.to_dict() for rule in profile.detection_rules],
+            'detection_rules': detection_rules,
             'processes_to_kill': profile.uninstall.kill_processes,
             'paths_to_remove': profile.uninstall.remove_paths,
             'registry_keys_to_remove': profile.uninstall.remove_registry,
-            'shortcuts': [sc.to_dict() for sc in profile.shortcuts]
+            'shortcuts': shortcuts
         }
         
-        script = template.render(**context)
+        script = self._uninstall_template.render(context)
         logger.info(f"Uninstall script generated successfully ({len(script)} characters)")
         
         return script
     
-    def generate_detection_script(self, profile: ApplicationProfile) -> str:
-        """
-        Generate detection.ps1 script from application profile.
-        
-        Args:
-            profile: Application profile containing detection rules
-            
-        Returns:
-            Generated PowerShell script content
-        """
+    def _render_detection(self, profile: ApplicationProfile, detection_rules: List[Dict]) -> str:
         logger.info(f"Generating detection script for {profile.name} v{profile.version}")
         
-        # Use comprehensive detection template
-        template_name = "detection/comprehensive.ps1"
-        template = self.env.get_template(template_name)
-        
         # Prepare template variables
         context = {
             'app_name': profile.name,
             'app_version': profile.version,
             'publisher': profile.publisher,
-            'detection_rules': [rule.to_dict() for rule in profile.detection_rules],
+            'detection_rules': detection_rules,
             'custom_detection_script': profile.custom_detection_script
         }
         
-        script = template.render(**context)
+        script = self._detection_template.render(context)
         logger.info(f"Detection script generated successfully ({len(script)} characters)")
         
         return script
@@ -154,15 +207,34 @@ class ScriptGenerator:
         """
         logger.info(f"Generating all scripts for {profile.name} v{profile.version}")
         
+        cache_key = self._profile_cache_key(profile)
+        cached = self._script_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Profile unchanged, reusing previously generated scripts")
+            return dict(cached)
+        
+        detection_rules = self._detection_rule_dicts(profile)
+        shortcuts = self._shortcut_dicts(profile)
         scripts = {
-            'install.ps1': self.generate_install_script(profile),
-            'uninstall.ps1': self.generate_uninstall_script(profile),
-            'detection.ps1': self.generate_detection_script(profile)
+            'install.ps1': self._render_install(profile, detection_rules, shortcuts),
+            'uninstall.ps1': self._render_uninstall(profile, detection_rules, shortcuts),
+            'detection.ps1': self._render_detection(profile, detection_rules)
         }
+        self._script_cache.pop(cache_key, None)
+        if len(self._script_cache) >= self.SCRIPT_CACHE_SIZE:
+            # Dicts keep insertion order, so this drops the oldest entry
+            del self._script_cache[next(iter(self._script_cache))]
+        self._script_cache[cache_key] = dict(scripts)
         
         logger.info(f"All scripts generated successfully")
         return scripts
     
+    @staticmethod
+    def _profile_cache_key(profile: ApplicationProfile) -> str:
+        """Hash the profile content (not its identity) for script memoization."""
+        # to_dict() emits keys in a fixed order, so the bytes are deterministic
+        return hashlib.blake2b(profile.to_json_bytes(), digest_size=16).hexdigest()
+    
     def save_scripts(self, profile: ApplicationProfile, output_dir: str) -> Dict[str, str]:
         """
         Generate and save all scripts to specified directory.
@@ -184,8 +256,8 @@ class ScriptGenerator:
         
         for script_name, script_content in scripts.items():
             file_path = output_path / script_name
-            with open(file_path, 'w', encoding='utf-8', newline='\r\n') as f:
-                f.write(script_content)
+            # Same bytes text mode with newline='\r\n' would produce, in one write
+            file_path.write_bytes(script_content.replace('\n', '\r\n').encode('utf-8'))
             
             file_paths[script_name] = str(file_path)
             logger.info(f"Saved {script_name} to {file_path}")
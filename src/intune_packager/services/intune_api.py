@@ -7,21 +7,112 @@ import os
 import logging
 import json
 import asyncio
-from typing import Dict, List, Optional, Any
+import base64
+import random
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import Counter
+from typing import BinaryIO, Dict, List, Optional, Any
 from pathlib import Path
+from urllib.parse import quote
 
 import aiohttp
-from msal import PublicClientApplication, ConfidentialClientApplication
+from msal import PublicClientApplication, ConfidentialClientApplication, SerializableTokenCache
+
+from .._json import dumps_bytes, loads as json_loads
 
 logger = logging.getLogger(__name__)
 
 
+# Detection.xml EncryptionInfo elements -> Graph fileEncryptionInfo properties
+_ENCRYPTION_INFO_FIELDS = {
+    "EncryptionKey": "encryptionKey",
+    "MacKey": "macKey",
+    "InitializationVector": "initializationVector",
+    "Mac": "mac",
+    "ProfileIdentifier": "profileIdentifier",
+    "FileDigest": "fileDigest",
+    "FileDigestAlgorithm": "fileDigestAlgorithm"
+}
+
+
+def _read_intunewin_package(intunewin_path: str) -> Dict[str, Any]:
+    """
+    Read the upload details of a .intunewin package.
+    
+    The package is a zip holding the payload IntuneWinAppUtil already encrypted
+    (IntuneWinPackage/Contents/<FileName>) and IntuneWinPackage/Metadata/Detection.xml,
+    which records the payload's unencrypted size and its encryption info.
+    
+    Args:
+        intunewin_path: Path to .intunewin file
+        
+    Returns:
+        Dictionary with file_name, size, size_encrypted, content_member and
+        encryption_info (Graph fileEncryptionInfo)
+    """
+    try:
+        with zipfile.ZipFile(intunewin_path) as package:
+            root = ET.fromstring(package.read("IntuneWinPackage/Metadata/Detection.xml"))
+            file_name = root.findtext("FileName")
+            content_member = f"IntuneWinPackage/Contents/{file_name}"
+            size_encrypted = package.getinfo(content_member).file_size
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+        raise ValueError(f"Not a valid .intunewin package: {intunewin_path} ({e})") from e
+    
+    encryption_info = root.find("EncryptionInfo")
+    if encryption_info is None:
+        raise ValueError(f"No EncryptionInfo in Detection.xml of {intunewin_path}")
+    
+    return {
+        "file_name": file_name,
+        "size": int(root.findtext("UnencryptedContentSize")),
+        "size_encrypted": size_encrypted,
+        "content_member": content_member,
+        "encryption_info": {
+            graph_name: encryption_info.findtext(xml_name)
+            for xml_name, graph_name in _ENCRYPTION_INFO_FIELDS.items()
+        }
+    }
+
+
 class IntuneAPIClient:
-    """Client for Microsoft Graph API - Intune operations."""
+    """
+    Client for Microsoft Graph API - Intune operations.
+    
+    Requests share one pooled HTTP session. Use the client as an async context
+    manager so the session is closed when you are done (or call close()):
+    
+        async with IntuneAPIClient(tenant_id, client_id) as client:
+            await client.authenticate_service_principal(secret)
+            groups = await client.list_groups()
+    """
     
     GRAPH_API_ENDPOINT = "https://graph.microsoft.com/v1.0"
     GRAPH_API_BETA = "https://graph.microsoft.com/beta"
     
+    # Polling for the Azure Storage upload URI: exponential backoff with jitter
+    UPLOAD_URI_TIMEOUT = 120.0
+    UPLOAD_URI_INITIAL_DELAY = 0.25
+    UPLOAD_URI_MAX_DELAY = 5.0
+    
+    # Content is uploaded as concurrently staged blocks
+    BLOCK_SIZE = 4 * 1024 * 1024
+    MAX_CONCURRENT_BLOCKS = 8
+    
+    # Group properties requested from Graph (full group objects are several KB each)
+    GROUP_FIELDS = "id,displayName,description"
+    
+    # Default return codes for Win32 apps (shared, never mutated)
+    DEFAULT_RETURN_CODES = (
+        {"returnCode": 0, "type": "success"},
+        {"returnCode": 1707, "type": "success"},  # Already installed
+        {"returnCode": 3010, "type": "softReboot"},
+        {"returnCode": 1641, "type": "hardReboot"},
+        {"returnCode": 1618, "type": "retry"}
+    )
+    
     # Required scopes
     SCOPES = [
         "DeviceManagementApps.ReadWrite.All",
@@ -43,8 +134,63 @@ class IntuneAPIClient:
         self.access_token = None
         self.token_cache_path = Path.home() / ".intune_packager" / "token_cache.json"
         
+        # Shared HTTP session (connection pool), created on first request
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        
         logger.info("IntuneAPIClient initialized")
     
+    async def __aenter__(self) -> "IntuneAPIClient":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use and per event loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._session_loop is not loop:
+            # A session is bound to the loop it was created on (e.g. an earlier
+            # asyncio.run()); its connections can't be used or closed from this one
+            logger.debug("Event loop changed, starting a new HTTP session")
+            self._session = None
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=20, ttl_dns_cache=300, keepalive_timeout=75)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._session_loop = loop
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the shared HTTP session and its pooled connections."""
+        if self._session is not None:
+            if self._session_loop is asyncio.get_running_loop():
+                await self._session.close()
+            self._session = None
+            self._session_loop = None
+    
+    def _load_token_cache(self) -> SerializableTokenCache:
+        """Load the MSAL token cache persisted by a previous run, if any."""
+        cache = SerializableTokenCache()
+        if self.token_cache_path.exists():
+            try:
+                cache.deserialize(self.token_cache_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable token cache: {e}")
+        return cache
+    
+    def _save_token_cache(self, cache: SerializableTokenCache) -> None:
+        """Persist the MSAL token cache if an acquisition changed it."""
+        if not cache.has_state_changed:
+            return
+        try:
+            self.token_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Tokens are credentials: keep the file private to the user
+            fd = os.open(self.token_cache_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(cache.serialize())
+        except OSError as e:
+            logger.warning(f"Could not save token cache: {e}")
+    
     async def authenticate_interactive(self) -> bool:
         """
         Authenticate using interactive browser flow (for GUI users).
@@ -57,9 +203,11 @@ class IntuneAPIClient:
         if not self.client_id:
             raise ValueError("client_id is required for authentication")
         
+        cache = self._load_token_cache()
         app = PublicClientApplication(
             client_id=self.client_id,
-            authority=f"https://login.microsoftonline.com/{self.tenant_id or 'common'}"
+            authority=f"https://login.microsoftonline.com/{self.tenant_id or 'common'}",
+            token_cache=cache
         )
         
         # Try to get token from cache first
@@ -69,11 +217,13 @@ class IntuneAPIClient:
             result = app.acquire_token_silent(self.SCOPES, account=accounts[0])
             if result and "access_token" in result:
                 self.access_token = result["access_token"]
+                self._save_token_cache(cache)
                 logger.info("Acquired token from cache")
                 return True
         
         # Interactive authentication
         result = app.acquire_token_interactive(scopes=self.SCOPES)
+        self._save_token_cache(cache)
         
         if "access_token" in result:
             self.access_token = result["access_token"]
@@ -99,13 +249,17 @@ class IntuneAPIClient:
         if not all([self.tenant_id, self.client_id, client_secret]):
             raise ValueError("tenant_id, client_id, and client_secret are required")
         
+        cache = self._load_token_cache()
         app = ConfidentialClientApplication(
             client_id=self.client_id,
             client_credential=client_secret,
-            authority=f"https://login.microsoftonline.com/{self.tenant_id}"
+            authority=f"https://login.microsoftonline.com/{self.tenant_id}",
+            token_cache=cache
         )
         
+        # Served from the cache while the previous token is still valid
         result = app.acquire_token_for_client(scopes=["https://graph.microsoft.com/.default"])
+        self._save_token_cache(cache)
         
         if "access_token" in result:
             self.access_token = result["access_token"]
@@ -129,7 +283,8 @@ class IntuneAPIClient:
         
         Args:
             method: HTTP method (GET, POST, PATCH, DELETE)
-            endpoint: API endpoint (without base URL)
+            endpoint: API endpoint (without base URL), or an absolute URL such as
+                an @odata.nextLink
             data: Request body (for POST/PATCH)
             params: Query parameters
             use_beta: Use beta endpoint instead of v1.0
@@ -140,28 +295,34 @@ class IntuneAPIClient:
         if not self.access_token:
             raise RuntimeError("Not authenticated. Call authenticate_* first.")
         
-        base_url = self.GRAPH_API_BETA if use_beta else self.GRAPH_API_ENDPOINT
-        url = f"{base_url}/{endpoint.lstrip('/')}"
+        if endpoint.startswith("https://"):
+            url = endpoint
+        else:
+            base_url = self.GRAPH_API_BETA if use_beta else self.GRAPH_API_ENDPOINT
+            url = f"{base_url}/{endpoint.lstrip('/')}"
         
         headers = {
             "Authorization": f"Bearer {self.access_token}",
             "Content-Type": "application/json"
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.request(
-                method=method,
-                url=url,
-                headers=headers,
-                json=data,
-                params=params
-            ) as response:
-                if response.status >= 400:
-                    error_text = await response.text()
-                    logger.error(f"API request failed: {response.status} - {error_text}")
-                    raise RuntimeError(f"API request failed: {response.status} - {error_text}")
-                
-                return await response.json()
+        # Content-Type is already set, so send pre-serialized bytes instead of json=
+        body = dumps_bytes(data) if data is not None else None
+        
+        session = await self._get_session()
+        async with session.request(
+            method=method,
+            url=url,
+            headers=headers,
+            data=body,
+            params=params
+        ) as response:
+            if response.status >= 400:
+                error_text = await response.text()
+                logger.error(f"API request failed: {response.status} - {error_text}")
+                raise RuntimeError(f"API request failed: {response.status} - {error_text}")
+            
+            return await response.json(loads=json_loads)
     
     # ===== Azure AD Groups =====
     
@@ -177,9 +338,9 @@ class IntuneAPIClient:
         """
         logger.info(f"Listing groups (search: {search_query})")
         
-        params = {}
+        params = {"$select": self.GROUP_FIELDS}
         if search_query:
-            params["$filter"] = f"startswith(displayName,'{search_query}')"
+            params["$filter"] = f"startswith(displayName,{self._odata_string(search_query)})"
         
         response = await self._make_request("GET", "groups", params=params)
         groups = response.get("value", [])
@@ -197,12 +358,22 @@ class IntuneAPIClient:
         Returns:
             Group object or None if not found
         """
-        params = {"$filter": f"displayName eq '{group_name}'"}
+        params = {
+            "$filter": f"displayName eq {self._odata_string(group_name)}",
+            "$select": self.GROUP_FIELDS,
+            "$top": "1"
+        }
         response = await self._make_request("GET", "groups", params=params)
         
         groups = response.get("value", [])
         return groups[0] if groups else None
     
+    @staticmethod
+    def _odata_string(value: str) -> str:
+        """Quote a value as an OData string literal (single quotes are doubled)."""
+        escaped = value.replace("'", "''")
+        return f"'{escaped}'"
+    
     # ===== Win32 App Management =====
     
     async def create_win32_app(self, app_metadata: Dict) -> Dict:
@@ -232,7 +403,7 @@ class IntuneAPIClient:
             },
             "detectionRules": app_metadata["detectionRules"],
             "requirementRules": app_metadata.get("requirementRules", []),
-            "returnCodes": app_metadata.get("returnCodes", self._get_default_return_codes())
+            "returnCodes": app_metadata.get("returnCodes", self.DEFAULT_RETURN_CODES)
         }
         
         response = await self._make_request(
@@ -254,8 +425,8 @@ class IntuneAPIClient:
         This is a complex multi-step process:
         1. Create content version
         2. Create file upload session
-        3. Upload encrypted file to Azure Storage
-        4. Commit the file
+        3. Upload the encrypted payload inside the package to Azure Storage
+        4. Commit the file with the payload's encryption info from Detection.xml
         
         Args:
             app_id: Application ID from create_win32_app
@@ -266,8 +437,7 @@ class IntuneAPIClient:
         """
         logger.info(f"Uploading .intunewin content for app {app_id}")
         
-        file_size = os.path.getsize(intunewin_path)
-        file_name = os.path.basename(intunewin_path)
+        package = _read_intunewin_package(intunewin_path)
         
         # Step 1: Create content version
         logger.info("Step 1: Creating content version")
@@ -275,103 +445,154 @@ class IntuneAPIClient:
             "@odata.type": "#microsoft.graph.mobileAppContent"
         }
         
+        # Every later step addresses this content version (and then its file)
+        content_versions_endpoint = f"deviceAppManagement/mobileApps/{app_id}/microsoft.graph.win32LobApp/contentVersions"
+        
         content_response = await self._make_request(
             "POST",
-            f"deviceAppManagement/mobileApps/{app_id}/microsoft.graph.win32LobApp/contentVersions",
+            content_versions_endpoint,
             data=content_version_payload,
             use_beta=True
         )
         
         content_version_id = content_response["id"]
+        content_version_endpoint = f"{content_versions_endpoint}/{content_version_id}"
         logger.info(f"Content version created: {content_version_id}")
         
         # Step 2: Create file upload session
         logger.info("Step 2: Creating file upload session")
         file_payload = {
             "@odata.type": "#microsoft.graph.mobileAppContentFile",
-            "name": file_name,
-            "size": file_size,
-            "sizeEncrypted": file_size,  # Simplified - actual encryption would change size
+            "name": package["file_name"],
+            "size": package["size"],
+            "sizeEncrypted": package["size_encrypted"],
             "manifest": None
         }
         
         file_response = await self._make_request(
             "POST",
-            f"deviceAppManagement/mobileApps/{app_id}/microsoft.graph.win32LobApp/contentVersions/{content_version_id}/files",
+            f"{content_version_endpoint}/files",
             data=file_payload,
             use_beta=True
         )
         
         file_id = file_response["id"]
+        # Absolute, so the poll loop and commit skip the base URL join
+        file_url = f"{self.GRAPH_API_BETA}/{content_version_endpoint}/files/{file_id}"
         logger.info(f"File entry created: {file_id}")
         
         # Step 3: Wait for Azure Storage URL
         logger.info("Step 3: Waiting for upload URL")
-        max_retries = 30
-        for i in range(max_retries):
-            await asyncio.sleep(2)
-            
-            file_status = await self._make_request(
-                "GET",
-                f"deviceAppManagement/mobileApps/{app_id}/microsoft.graph.win32LobApp/contentVersions/{content_version_id}/files/{file_id}",
-                use_beta=True
-            )
+        # The URI is often ready right away: poll first, back off only while it isn't
+        delay = self.UPLOAD_URI_INITIAL_DELAY
+        deadline = time.monotonic() + self.UPLOAD_URI_TIMEOUT
+        while True:
+            file_status = await self._make_request("GET", file_url)
             
             upload_state = file_status.get("uploadState")
             if upload_state == "azureStorageUriRequestSuccess":
                 azure_storage_uri = file_status["azureStorageUri"]
                 logger.info("Azure Storage URI received")
                 break
-        else:
-            raise RuntimeError("Timeout waiting for Azure Storage URI")
+            if upload_state == "azureStorageUriRequestFailed":
+                raise RuntimeError("Azure Storage URI request failed")
+            
+            if time.monotonic() >= deadline:
+                raise RuntimeError("Timeout waiting for Azure Storage URI")
+            
+            await asyncio.sleep(delay + random.random() * 0.1)
+            delay = min(delay * 1.7, self.UPLOAD_URI_MAX_DELAY)
         
         # Step 4: Upload to Azure Storage
         logger.info("Step 4: Uploading file to Azure Storage")
-        await self._upload_to_azure_storage(azure_storage_uri, intunewin_path)
+        await self._upload_to_azure_storage(azure_storage_uri, intunewin_path, package["content_member"])
         
         # Step 5: Commit the file
         logger.info("Step 5: Committing file")
         commit_payload = {
-            "fileEncryptionInfo": {
-                "encryptionKey": "dummy_key",  # In real implementation, use actual encryption
-                "macKey": "dummy_mac",
-                "initializationVector": "dummy_iv",
-                "mac": "dummy_mac_value",
-                "profileIdentifier": "ProfileVersion1",
-                "fileDigest": "dummy_digest",
-                "fileDigestAlgorithm": "SHA256"
-            }
+            "fileEncryptionInfo": package["encryption_info"]
         }
         
         await self._make_request(
             "POST",
-            f"deviceAppManagement/mobileApps/{app_id}/microsoft.graph.win32LobApp/contentVersions/{content_version_id}/files/{file_id}/commit",
-            data=commit_payload,
-            use_beta=True
+            f"{file_url}/commit",
+            data=commit_payload
         )
         
         logger.info("Upload completed successfully")
         return True
     
-    async def _upload_to_azure_storage(self, sas_uri: str, file_path: str):
-        """Upload file to Azure Storage using SAS URI."""
-        # This is a simplified version - real implementation would use Azure SDK
-        logger.info(f"Uploading {file_path} to Azure Storage")
+    async def _upload_to_azure_storage(self, sas_uri: str, intunewin_path: str, content_member: str):
+        """
+        Upload the encrypted content inside a .intunewin package to Azure Storage using SAS URI.
         
-        with open(file_path, 'rb') as f:
-            file_data = f.read()
+        Args:
+            sas_uri: Azure Storage URI returned for the content file
+            intunewin_path: Path to .intunewin file
+            content_member: Archive path of the encrypted payload (see _read_intunewin_package)
+        """
+        logger.info(f"Uploading {content_member} from {intunewin_path} to Azure Storage")
         
-        headers = {
-            "x-ms-blob-type": "BlockBlob"
-        }
+        session = await self._get_session()
         
-        async with aiohttp.ClientSession() as session:
-            async with session.put(sas_uri, data=file_data, headers=headers) as response:
-                if response.status not in [200, 201]:
-                    raise RuntimeError(f"Azure Storage upload failed: {response.status}")
+        # Streamed straight out of the archive; IntuneWinAppUtil already encrypted it
+        with zipfile.ZipFile(intunewin_path) as package, package.open(content_member) as content:
+            await self._upload_blocks(session, sas_uri, content)
         
         logger.info("File uploaded to Azure Storage")
     
+    async def _upload_blocks(self, session: aiohttp.ClientSession, sas_uri: str, stream: BinaryIO):
+        """
+        Upload a stream as staged blocks (Put Block), then commit them (Put Block List).
+        
+        At most MAX_CONCURRENT_BLOCKS blocks are read into memory and in flight at once.
+        """
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_BLOCKS)
+        
+        async def put_block(block_id: str, data: bytes):
+            try:
+                # Base64 IDs can contain '+', '/' and '=', which must be escaped in the query
+                url = f"{sas_uri}&comp=block&blockid={quote(block_id, safe='')}"
+                async with session.put(url, data=data) as response:
+                    if response.status != 201:
+                        raise RuntimeError(f"Azure Storage block upload failed: {response.status}")
+            finally:
+                semaphore.release()
+        
+        block_ids = []
+        tasks = []
+        try:
+            while True:
+                await semaphore.acquire()
+                data = stream.read(self.BLOCK_SIZE)
+                if not data:
+                    semaphore.release()
+                    break
+                
+                # Block IDs must all have the same length before encoding
+                block_id = base64.b64encode(f"{len(block_ids):08d}".encode()).decode()
+                block_ids.append(block_id)
+                tasks.append(asyncio.ensure_future(put_block(block_id, data)))
+            
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        block_list = "".join(f"<Latest>{block_id}</Latest>" for block_id in block_ids)
+        body = f'<?xml version="1.0" encoding="utf-8"?><BlockList>{block_list}</BlockList>'
+        
+        async with session.put(
+            f"{sas_uri}&comp=blocklist",
+            data=body.encode('utf-8'),
+            headers={"Content-Type": "application/xml"}
+        ) as response:
+            if response.status != 201:
+                raise RuntimeError(f"Azure Storage block list commit failed: {response.status}")
+        
+        logger.info(f"Committed {len(block_ids)} blocks")
+    
     # ===== App Assignments =====
     
     async def assign_app_to_groups(
@@ -451,15 +672,7 @@ class IntuneAPIClient:
         """
         logger.info(f"Setting {len(dependency_app_ids)} dependencies for app {app_id}")
         
-        relationships = []
-        for dep_id in dependency_app_ids:
-            relationships.append({
-                "@odata.type": "#microsoft.graph.mobileAppDependency",
-                "targetId": dep_id,
-                "dependencyType": "autoInstall"
-            })
-        
-        payload = {"relationships": relationships}
+        payload = {"relationships": self._dependency_relationships(dependency_app_ids)}
         
         await self._make_request(
             "POST",
@@ -490,13 +703,42 @@ class IntuneAPIClient:
         """
         logger.info(f"Setting supersedence for app {app_id}")
         
-        relationships = []
-        for old_app_id in superseded_app_ids:
-            relationships.append({
-                "@odata.type": "#microsoft.graph.mobileAppSupersedence",
-                "targetId": old_app_id,
-                "supersedenceType": "replace" if uninstall_previous else "update"
-            })
+        payload = {"relationships": self._supersedence_relationships(superseded_app_ids, uninstall_previous)}
+        
+        await self._make_request(
+            "POST",
+            f"deviceAppManagement/mobileApps/{app_id}/relationships",
+            data=payload,
+            use_beta=True
+        )
+        
+        logger.info("Supersedence set successfully")
+        return True
+    
+    async def set_app_relationships(
+        self,
+        app_id: str,
+        dependency_app_ids: Optional[List[str]] = None,
+        superseded_app_ids: Optional[List[str]] = None,
+        uninstall_previous: bool = True
+    ) -> bool:
+        """
+        Set app dependencies and supersedence together in a single request.
+        
+        Args:
+            app_id: Application ID
+            dependency_app_ids: List of app IDs that are dependencies
+            superseded_app_ids: List of old app IDs to replace
+            uninstall_previous: Whether to uninstall superseded apps
+            
+        Returns:
+            True if relationships set successfully
+        """
+        relationships = (
+            self._dependency_relationships(dependency_app_ids or [])
+            + self._supersedence_relationships(superseded_app_ids or [], uninstall_previous)
+        )
+        logger.info(f"Setting {len(relationships)} relationships for app {app_id}")
         
         payload = {"relationships": relationships}
         
@@ -507,9 +749,31 @@ class IntuneAPIClient:
             use_beta=True
         )
         
-        logger.info("Supersedence set successfully")
+        logger.info("Relationships set successfully")
         return True
     
+    @staticmethod
+    def _dependency_relationships(dependency_app_ids: List[str]) -> List[Dict]:
+        return [
+            {
+                "@odata.type": "#microsoft.graph.mobileAppDependency",
+                "targetId": dep_id,
+                "dependencyType": "autoInstall"
+            }
+            for dep_id in dependency_app_ids
+        ]
+    
+    @staticmethod
+    def _supersedence_relationships(superseded_app_ids: List[str], uninstall_previous: bool) -> List[Dict]:
+        return [
+            {
+                "@odata.type": "#microsoft.graph.mobileAppSupersedence",
+                "targetId": old_app_id,
+                "supersedenceType": "replace" if uninstall_previous else "update"
+            }
+            for old_app_id in superseded_app_ids
+        ]
+    
     # ===== Deployment Monitoring =====
     
     async def get_app_install_status(self, app_id: str) -> Dict:
@@ -532,47 +796,39 @@ class IntuneAPIClient:
         
         statuses = response.get("value", [])
         
-        # Aggregate statistics
-        summary = {
-            "total_devices": len(statuses),
-            "installed": 0,
-            "failed": 0,
-            "pending": 0,
-            "not_applicable": 0,
-            "devices": []
-        }
+        # Large tenants are paged; each nextLink carries an opaque skip token,
+        # so pages can only be fetched one after another
+        next_link = response.get("@odata.nextLink")
+        while next_link:
+            response = await self._make_request("GET", next_link)
+            statuses.extend(response.get("value", []))
+            next_link = response.get("@odata.nextLink")
         
-        for status in statuses:
-            install_state = status.get("installState", "unknown")
-            
-            if install_state == "installed":
-                summary["installed"] += 1
-            elif install_state == "failed":
-                summary["failed"] += 1
-            elif install_state in ["notInstalled", "available"]:
-                summary["pending"] += 1
-            else:
-                summary["not_applicable"] += 1
-            
-            summary["devices"].append({
+        devices = [
+            {
                 "device_name": status.get("deviceName"),
                 "user_name": status.get("userName"),
-                "install_state": install_state,
+                "install_state": status.get("installState", "unknown"),
                 "error_code": status.get("errorCode"),
                 "last_sync": status.get("lastSyncDateTime")
-            })
+            }
+            for status in statuses
+        ]
+        
+        # Aggregate statistics
+        states = Counter(device["install_state"] for device in devices)
+        installed = states.pop("installed", 0)
+        failed = states.pop("failed", 0)
+        pending = states.pop("notInstalled", 0) + states.pop("available", 0)
+        
+        summary = {
+            "total_devices": len(statuses),
+            "installed": installed,
+            "failed": failed,
+            "pending": pending,
+            "not_applicable": sum(states.values()),
+            "devices": devices
+        }
         
         logger.info(f"Status: {summary['installed']} installed, {summary['failed']} failed")
         return summary
-    
-    # ===== Helper Methods =====
-    
-    def _get_default_return_codes(self) -> List[Dict]:
-        """Get default return codes for Win32 apps."""
-        return [
-            {"returnCode": 0, "type": "success"},
-            {"returnCode": 1707, "type": "success"},  # Already installed
-            {"returnCode": 3010, "type": "softReboot"},
-            {"returnCode": 1641, "type": "hardReboot"},
-            {"returnCode": 1618, "type": "retry"}
-        ]
@@ -0,0 +1,107 @@
+"""
+Tests for the application analyzer and its persistent analysis cache.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from intune_packager.analyzer import AnalysisCache, ApplicationAnalyzer
+
+
+class AnalysisCacheTests(unittest.TestCase):
+    """AnalysisCache round trips, persistence and invalidation."""
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.cache_path = os.path.join(self.tmp, "cache", "analysis.json")
+        self.installer = os.path.join(self.tmp, "setup.exe")
+        self._write(b"MZ version 1")
+        self.result = {"file_name": "setup.exe", "imported_dlls": ["KERNEL32.dll"]}
+    
+    def _write(self, data: bytes) -> None:
+        with open(self.installer, "wb") as f:
+            f.write(data)
+    
+    def test_miss_for_unknown_file(self):
+        self.assertIsNone(AnalysisCache(self.cache_path).get(self.installer))
+    
+    def test_round_trip_returns_a_copy(self):
+        cache = AnalysisCache(self.cache_path)
+        cache.put(self.installer, self.result)
+        
+        cached = cache.get(self.installer)
+        self.assertEqual(cached, self.result)
+        cached["imported_dlls"].append("USER32.dll")
+        self.assertEqual(cache.get(self.installer), self.result)
+    
+    def test_entries_survive_reload(self):
+        AnalysisCache(self.cache_path).put(self.installer, self.result)
+        
+        self.assertEqual(AnalysisCache(self.cache_path).get(self.installer), self.result)
+    
+    def test_content_change_with_same_size_invalidates(self):
+        cache = AnalysisCache(self.cache_path)
+        cache.put(self.installer, self.result)
+        st = os.stat(self.installer)
+        
+        self._write(b"MZ version 2")
+        # Same size and mtime: only the header digest tells the files apart
+        os.utime(self.installer, ns=(st.st_atime_ns, st.st_mtime_ns))
+        
+        self.assertIsNone(cache.get(self.installer))
+    
+    def test_mtime_change_invalidates(self):
+        cache = AnalysisCache(self.cache_path)
+        cache.put(self.installer, self.result)
+        st = os.stat(self.installer)
+        
+        os.utime(self.installer, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        
+        self.assertIsNone(cache.get(self.installer))
+    
+    def test_unreadable_cache_file_starts_empty(self):
+        os.makedirs(os.path.dirname(self.cache_path))
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        
+        cache = AnalysisCache(self.cache_path)
+        self.assertIsNone(cache.get(self.installer))
+        
+        cache.put(self.installer, self.result)
+        self.assertEqual(AnalysisCache(self.cache_path).get(self.installer), self.result)
+
+
+
+class DetectInstallerTypeTests(unittest.TestCase):
+    """detect_installer_type reuses an import list the caller already has."""
+    
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        self.exe = os.path.join(tmp, "setup.exe")
+        with open(self.exe, "wb") as f:
+            f.write(b"MZ" + b"\0" * 62 + b"This program cannot be run in DOS mode.")
+        self.analyzer = ApplicationAnalyzer()
+        if not self.analyzer.pefile_available:
+            self.skipTest("pefile is not installed")
+    
+    def test_given_imports_skip_the_import_parse(self):
+        with mock.patch.object(ApplicationAnalyzer, "_cached_import_names") as parse:
+            self.assertEqual(self.analyzer.detect_installer_type(self.exe, ["KERNEL32.dll", "msi.dll"]), "MSI-based")
+            self.assertEqual(self.analyzer.detect_installer_type(self.exe, ["KERNEL32.dll"]), "PE Executable")
+        
+        parse.assert_not_called()
+    
+    def test_imports_are_parsed_when_not_given(self):
+        with mock.patch.object(ApplicationAnalyzer, "_cached_import_names", return_value=("MSI.DLL",)) as parse:
+            self.assertEqual(self.analyzer.detect_installer_type(self.exe), "MSI-based")
+        
+        parse.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+"""
+Tests for the application profile model.
+"""
+
+import unittest
+
+from intune_packager.models.app_profile import ApplicationProfile
+
+
+class ProfileListDefaultsTests(unittest.TestCase):
+    """List fields left out of the config are independent, appendable lists."""
+    
+    def test_missing_lists_default_to_fresh_lists(self):
+        first = ApplicationProfile.from_dict({'application': {'name': 'A', 'version': '1', 'publisher': 'P'}})
+        second = ApplicationProfile.from_dict({'application': {'name': 'B', 'version': '1', 'publisher': 'P'}})
+        
+        first.dependencies.append('Runtime')
+        first.supersedes.append('Old App')
+        first.uninstall.kill_processes.append('app.exe')
+        first.company_portal.screenshots.append('screen.png')
+        
+        self.assertEqual(second.dependencies, [])
+        self.assertEqual(second.supersedes, [])
+        self.assertEqual(second.uninstall.kill_processes, [])
+        self.assertEqual(second.company_portal.screenshots, [])
+    
+    def test_constructed_profile_lists(self):
+        profile = ApplicationProfile(name='A', version='1', publisher='P')
+        
+        self.assertIsInstance(profile.dependencies, list)
+        self.assertIsNot(profile.dependencies, ApplicationProfile(name='B', version='1', publisher='P').dependencies)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Tests for the installer build cache.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from build_installer import build_cache_entry, is_build_cached
+
+
+class BuildCacheTests(unittest.TestCase):
+    """Reusing a previous build only while its executable is untouched."""
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.exe_path = Path(self.tmp) / "IntuneAppPackager-Installer.exe"
+        self.exe_path.write_bytes(b"full build")
+        self.entry = build_cache_entry("key", self.exe_path)
+    
+    def test_hit_when_key_and_executable_match(self):
+        self.assertTrue(is_build_cached(self.entry, "key", self.exe_path))
+    
+    def test_miss_when_key_changes(self):
+        self.assertFalse(is_build_cached(self.entry, "other", self.exe_path))
+    
+    def test_miss_when_another_build_overwrites_executable(self):
+        # build_installer_minimal.py writes the same dist/ executable
+        self.exe_path.write_bytes(b"minimal build, different size")
+        
+        self.assertFalse(is_build_cached(self.entry, "key", self.exe_path))
+    
+    def test_miss_when_executable_is_rewritten_with_same_size(self):
+        stat = self.exe_path.stat()
+        os.utime(self.exe_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        
+        self.assertFalse(is_build_cached(self.entry, "key", self.exe_path))
+    
+    def test_miss_when_executable_is_missing(self):
+        self.exe_path.unlink()
+        
+        self.assertFalse(is_build_cached(self.entry, "key", self.exe_path))
+    
+    def test_miss_for_entry_without_executable_details(self):
+        # Entries written before the executable was recorded held only the key
+        self.assertFalse(is_build_cached("key", "key", self.exe_path))
+        self.assertFalse(is_build_cached(None, "key", self.exe_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for batch configuration validation.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from intune_packager import config
+from intune_packager.config import ConfigManager
+
+
+class ValidateConfigTests(unittest.TestCase):
+    """Required application fields are checked by key presence."""
+    
+    def _errors(self, app: dict) -> list:
+        is_valid, errors = ConfigManager().validate_config({'applications': [app]})
+        self.assertEqual(is_valid, not errors)
+        return errors
+    
+    def test_missing_source_keys(self):
+        self.assertEqual(
+            self._errors({'name': 'App'}),
+            ["Application 1: must have 'source_file' or 'source_folder'"]
+        )
+    
+    def test_source_key_present_without_value_passes_validation(self):
+        # A key left empty in YAML is present (with value None) and is accepted here;
+        # the batch run skips it later
+        self.assertEqual(self._errors({'source_file': None}), [])
+        self.assertEqual(self._errors({'source_folder': None, 'setup_file': None}), [])
+    
+    def test_source_folder_requires_setup_file_key(self):
+        self.assertEqual(
+            self._errors({'source_folder': 'C:/Installers/App'}),
+            ["Application 1: 'setup_file' required when using 'source_folder'"]
+        )
+    
+    def test_parse_keeps_entries_with_empty_source(self):
+        parsed = ConfigManager().parse_config_for_batch({'applications': [{'source_file': None}]})
+        
+        self.assertEqual(len(parsed['applications']), 1)
+        self.assertIsNone(parsed['applications'][0]['source_file'])
+
+
+
+class ParseCacheTests(unittest.TestCase):
+    """load_config reuses a parse until the file changes or the TTL runs out."""
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.path = os.path.join(self.tmp, "batch.json")
+        self._write({'applications': [{'source_file': 'a.exe'}]})
+    
+    def _write(self, data: dict) -> None:
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+    
+    def _manager(self, **kwargs):
+        manager = ConfigManager(**kwargs)
+        loader = mock.Mock(wraps=manager._load_json)
+        manager._load_json = loader
+        return manager, loader
+    
+    def test_unchanged_file_is_parsed_once(self):
+        manager, loader = self._manager()
+        
+        first = manager.load_config(self.path)
+        first['applications'].append({'source_file': 'b.exe'})
+        second = manager.load_config(self.path)
+        
+        self.assertEqual(loader.call_count, 1)
+        # Callers get their own copy
+        self.assertEqual(second, {'applications': [{'source_file': 'a.exe'}]})
+    
+    def test_mtime_change_reparses(self):
+        manager, loader = self._manager()
+        manager.load_config(self.path)
+        
+        self._write({'applications': [{'source_file': 'c.exe'}]})
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        
+        self.assertEqual(manager.load_config(self.path)['applications'][0]['source_file'], 'c.exe')
+        self.assertEqual(loader.call_count, 2)
+    
+    def test_ttl_expiry_reparses(self):
+        manager, loader = self._manager(cache_ttl=60)
+        
+        with mock.patch.object(config.time, 'monotonic', return_value=1000.0):
+            manager.load_config(self.path)
+        with mock.patch.object(config.time, 'monotonic', return_value=1059.0):
+            manager.load_config(self.path)
+        self.assertEqual(loader.call_count, 1)
+        
+        with mock.patch.object(config.time, 'monotonic', return_value=1061.0):
+            manager.load_config(self.path)
+        self.assertEqual(loader.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+"""
+Tests for the IntuneWinAppUtil wrapper.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from intune_packager import converter
+from intune_packager.converter import IntuneWinConverter
+
+
+class ConverterTestCase(unittest.TestCase):
+    """Temp directory with a stand-in tool file."""
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.tool = os.path.join(self.tmp, "IntuneWinAppUtil.exe")
+        with open(self.tool, "wb") as f:
+            f.write(b"MZ")
+        self.converter = IntuneWinConverter(self.tool)
+
+
+class FindIntuneToolTests(ConverterTestCase):
+    """Locating IntuneWinAppUtil.exe without an explicit path."""
+    
+    def setUp(self):
+        super().setUp()
+        self.workdir = os.path.join(self.tmp, "work")
+        self.home = os.path.join(self.tmp, "home")
+        os.makedirs(self.workdir)
+        os.makedirs(os.path.join(self.home, "Downloads"))
+        
+        cwd = os.getcwd()
+        os.chdir(self.workdir)
+        self.addCleanup(os.chdir, cwd)
+        patcher = mock.patch("os.path.expanduser", return_value=self.home)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_finds_tool_in_working_directory(self):
+        path = os.path.join(self.workdir, "IntuneWinAppUtil.exe")
+        open(path, "wb").close()
+        
+        self.assertEqual(self.converter._find_intune_tool(), os.path.abspath(path))
+    
+    def test_finds_tool_in_downloads(self):
+        path = os.path.join(self.home, "Downloads", "IntuneWinAppUtil.exe")
+        open(path, "wb").close()
+        
+        self.assertEqual(self.converter._find_intune_tool(), path)
+    
+    def test_directory_with_tool_name_is_skipped(self):
+        os.makedirs(os.path.join(self.workdir, "IntuneWinAppUtil.exe"))
+        
+        with mock.patch.object(converter, "_which_intune_tool", return_value="/opt/bin/IntuneWinAppUtil.exe"):
+            self.assertEqual(self.converter._find_intune_tool(), "/opt/bin/IntuneWinAppUtil.exe")
+    
+    def test_not_found(self):
+        with mock.patch.object(converter, "_which_intune_tool", return_value=None):
+            self.assertIsNone(self.converter._find_intune_tool())
+
+
+class ValidateToolTests(ConverterTestCase):
+    """Only successful tool validations are remembered."""
+    
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(converter, "_validated_tools", set())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_success_is_cached(self):
+        with mock.patch("subprocess.run", return_value=mock.Mock(returncode=0, stdout="")) as run:
+            self.assertTrue(self.converter.validate_tool())
+            self.assertTrue(self.converter.validate_tool())
+        
+        self.assertEqual(run.call_count, 1)
+    
+    def test_failure_is_retried(self):
+        outcomes = [subprocess.TimeoutExpired("IntuneWinAppUtil.exe", 5), mock.Mock(returncode=0, stdout="")]
+        
+        with mock.patch("subprocess.run", side_effect=outcomes) as run:
+            self.assertFalse(self.converter.validate_tool())
+            self.assertTrue(self.converter.validate_tool())
+            self.assertTrue(self.converter.validate_tool())
+        
+        self.assertEqual(run.call_count, 2)
+
+
+class StageFileTests(ConverterTestCase):
+    """_stage_file falls back from hardlink to symlink to copy."""
+    
+    def setUp(self):
+        super().setUp()
+        self.source = os.path.join(self.tmp, "setup.exe")
+        with open(self.source, "wb") as f:
+            f.write(b"MZ installer")
+        self.dest = os.path.join(self.tmp, "staged.exe")
+    
+    def _assert_staged(self):
+        with open(self.dest, "rb") as f:
+            self.assertEqual(f.read(), b"MZ installer")
+    
+    def test_hardlink(self):
+        self.assertEqual(IntuneWinConverter._stage_file(self.source, self.dest), "hardlink")
+        self.assertTrue(os.path.samefile(self.source, self.dest))
+        self._assert_staged()
+    
+    def test_symlink_when_hardlink_fails(self):
+        with mock.patch("os.link", side_effect=OSError("cross-device link")):
+            self.assertEqual(IntuneWinConverter._stage_file(self.source, self.dest), "symlink")
+        self.assertTrue(os.path.islink(self.dest))
+        self._assert_staged()
+    
+    def test_copy_when_links_fail(self):
+        with mock.patch("os.link", side_effect=OSError("cross-device link")), \
+                mock.patch("os.symlink", side_effect=OSError("privilege not held")):
+            self.assertEqual(IntuneWinConverter._stage_file(self.source, self.dest), "copy")
+        self.assertFalse(os.path.islink(self.dest))
+        self.assertFalse(os.path.samefile(self.source, self.dest))
+        self._assert_staged()
+
+
+class RunToolTests(ConverterTestCase):
+    """_run_tool streams the tool's output and keeps only its tail."""
+    
+    def _python(self, code: str) -> list:
+        return [sys.executable, "-c", code]
+    
+    def test_keeps_last_lines_of_long_output(self):
+        cmd = self._python(
+            "import sys\n"
+            "for i in range(1000): print(f'line {i}')\n"
+            "sys.stderr.write('warning\\n' * 20000)"
+        )
+        
+        stdout, stderr = self.converter._run_tool(cmd, quiet=False)
+        
+        lines = stdout.split("\n")
+        self.assertEqual(len(lines), IntuneWinConverter.OUTPUT_TAIL_LINES)
+        self.assertEqual(lines[0], "line 800")
+        self.assertEqual(lines[-1], "line 999")
+        # Large stderr is drained alongside stdout instead of blocking the tool
+        self.assertEqual(stderr, "warning\n" * 20000)
+    
+    def test_failure_raises_with_output(self):
+        cmd = self._python("import sys; print('packing'); sys.stderr.write('bad setup file'); sys.exit(3)")
+        
+        with self.assertRaises(subprocess.CalledProcessError) as caught:
+            self.converter._run_tool(cmd, quiet=False)
+        
+        self.assertEqual(caught.exception.returncode, 3)
+        self.assertEqual(caught.exception.output, "packing")
+        self.assertEqual(caught.exception.stderr, "bad setup file")
+    
+    def test_quiet_discards_stdout(self):
+        cmd = self._python("import sys; print('packing'); sys.stderr.write('note')")
+        
+        self.assertEqual(self.converter._run_tool(cmd, quiet=True), ("", "note"))
+
+
+if __name__ == "__main__":
+    unittest.main()
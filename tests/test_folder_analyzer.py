@@ -0,0 +1,72 @@
+"""
+Tests for the folder analyzer's result types.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from intune_packager.folder_analyzer import AnalyzedFile, FolderAnalysisResult, FolderAnalyzer
+
+
+class AnalyzedFileTests(unittest.TestCase):
+    """AnalyzedFile and FolderAnalysisResult behave as slotted dataclasses."""
+    
+    def _file(self, **overrides) -> AnalyzedFile:
+        values = dict(
+            path=Path("setup.exe"), name="setup.exe", size=10, type="installer",
+            confidence=0.8, suggested_purpose="Main installer"
+        )
+        values.update(overrides)
+        return AnalyzedFile(**values)
+    
+    def test_equality_compares_fields(self):
+        self.assertEqual(self._file(), self._file())
+        self.assertNotEqual(self._file(), self._file(size=11))
+        self.assertNotEqual(self._file(), self._file(metadata={"installer_type": "msi"}))
+    
+    def test_metadata_defaults_to_a_fresh_dict(self):
+        first, second = self._file(), self._file()
+        first.metadata["is_dependency"] = True
+        
+        self.assertEqual(second.metadata, {})
+    
+    def test_slotted(self):
+        self.assertFalse(hasattr(self._file(), "__dict__"))
+        self.assertFalse(hasattr(FolderAnalysisResult(), "__dict__"))
+    
+    def test_result_lists_are_not_shared(self):
+        first, second = FolderAnalysisResult(), FolderAnalysisResult()
+        first.warnings.append("No installer found")
+        
+        self.assertEqual(second.warnings, [])
+
+
+class AnalyzeFolderTests(unittest.TestCase):
+    """analyze_folder on a small installer folder."""
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+    
+    def test_analyzed_paths_are_path_objects(self):
+        os.makedirs(os.path.join(self.tmp, "redist"))
+        for name, size in (("setup.exe", 2_000_000), ("config.ini", 16), (os.path.join("redist", "vc_redist.msi"), 64)):
+            with open(os.path.join(self.tmp, name), "wb") as f:
+                f.truncate(size)
+        
+        result = FolderAnalyzer().analyze_folder(self.tmp)
+        
+        self.assertEqual(result.main_installer.path, Path(self.tmp, "setup.exe"))
+        self.assertEqual([dep.path for dep in result.dependencies], [Path(self.tmp, "redist", "vc_redist.msi")])
+        self.assertEqual([config.path for config in result.config_files], [Path(self.tmp, "config.ini")])
+        analyzed = [result.main_installer] + result.dependencies + result.config_files
+        for analyzed_file in analyzed:
+            self.assertIsInstance(analyzed_file.path, Path)
+            self.assertEqual(analyzed_file.path.name, analyzed_file.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,354 @@
+"""
+Tests for the Intune Graph API client.
+"""
+
+import asyncio
+import json
+import os
+import re
+import shutil
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from urllib.parse import quote
+
+from aiohttp import web
+from msal import SerializableTokenCache
+
+from intune_packager.services.intune_api import IntuneAPIClient, _read_intunewin_package
+
+DETECTION_XML = """﻿<?xml version="1.0" encoding="utf-8"?>
+<ApplicationInfo xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" ToolVersion="1.8.6.0">
+  <Name>setup.exe</Name>
+  <UnencryptedContentSize>{size}</UnencryptedContentSize>
+  <FileName>IntunePackage.intunewin</FileName>
+  <SetupFile>setup.exe</SetupFile>
+  <EncryptionInfo>
+    <EncryptionKey>a2V5</EncryptionKey>
+    <MacKey>bWFjS2V5</MacKey>
+    <InitializationVector>aXY=</InitializationVector>
+    <Mac>bWFj</Mac>
+    <ProfileIdentifier>ProfileVersion1</ProfileIdentifier>
+    <FileDigest>ZGlnZXN0</FileDigest>
+    <FileDigestAlgorithm>SHA256</FileDigestAlgorithm>
+  </EncryptionInfo>
+</ApplicationInfo>
+"""
+
+EXPECTED_ENCRYPTION_INFO = {
+    "encryptionKey": "a2V5",
+    "macKey": "bWFjS2V5",
+    "initializationVector": "aXY=",
+    "mac": "bWFj",
+    "profileIdentifier": "ProfileVersion1",
+    "fileDigest": "ZGlnZXN0",
+    "fileDigestAlgorithm": "SHA256"
+}
+
+
+def _write_intunewin(path: str, payload: bytes, unencrypted_size: int) -> None:
+    """Write a package laid out the way IntuneWinAppUtil does."""
+    with zipfile.ZipFile(path, "w") as package:
+        package.writestr(
+            "IntuneWinPackage/Metadata/Detection.xml",
+            DETECTION_XML.format(size=unencrypted_size).encode("utf-8")
+        )
+        package.writestr("IntuneWinPackage/Contents/IntunePackage.intunewin", payload)
+
+
+class ReadIntunewinPackageTests(unittest.TestCase):
+    """Reading upload details from a .intunewin package."""
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+    
+    def test_reads_sizes_and_encryption_info(self):
+        path = os.path.join(self.tmp, "app.intunewin")
+        _write_intunewin(path, b"x" * 1000, unencrypted_size=900)
+        
+        package = _read_intunewin_package(path)
+        
+        self.assertEqual(package["file_name"], "IntunePackage.intunewin")
+        self.assertEqual(package["size"], 900)
+        self.assertEqual(package["size_encrypted"], 1000)
+        self.assertEqual(package["content_member"], "IntuneWinPackage/Contents/IntunePackage.intunewin")
+        self.assertEqual(package["encryption_info"], EXPECTED_ENCRYPTION_INFO)
+    
+    def test_rejects_file_that_is_not_a_package(self):
+        path = os.path.join(self.tmp, "setup.exe")
+        with open(path, "wb") as f:
+            f.write(b"MZ")
+        
+        with self.assertRaises(ValueError):
+            _read_intunewin_package(path)
+
+
+class ContentUploadTests(unittest.IsolatedAsyncioTestCase):
+    """upload_intunewin_content against a local stand-in for Graph and Azure Storage."""
+    
+    async def asyncSetUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        
+        self.requests = []
+        self.blocks = {}
+        self.block_paths = []
+        self.blob = None
+        
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_put("/blob", self._storage)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.sas_uri = f"http://127.0.0.1:{port}/blob?sig=secret"
+        
+        self.client = IntuneAPIClient("tenant", "client")
+        self.client.access_token = "token"
+        self.client.BLOCK_SIZE = 64 * 1024
+        # Graph calls are answered here; only the storage upload goes over HTTP
+        self.client._make_request = self._graph
+    
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.runner.cleanup()
+    
+    async def _graph(self, method, endpoint, data=None, params=None, use_beta=False):
+        self.requests.append((method, endpoint, data))
+        if endpoint.endswith("/contentVersions"):
+            return {"id": "1"}
+        if endpoint.endswith("/files"):
+            return {"id": "file"}
+        if method == "GET":
+            return {"uploadState": "azureStorageUriRequestSuccess", "azureStorageUri": self.sas_uri}
+        return {}
+    
+    async def _storage(self, request):
+        data = await request.read()
+        if request.query.get("comp") == "block":
+            self.block_paths.append(request.raw_path)
+            self.blocks[request.query["blockid"]] = data
+        elif request.query.get("comp") == "blocklist":
+            block_ids = re.findall(r"<Latest>(.*?)</Latest>", data.decode())
+            self.blob = b"".join(self.blocks[block_id] for block_id in block_ids)
+        else:
+            return web.Response(status=400)
+        return web.Response(status=201)
+    
+    async def test_uploads_inner_payload_with_package_encryption_info(self):
+        payload = os.urandom(300 * 1024 + 5)
+        path = os.path.join(self.tmp, "app.intunewin")
+        _write_intunewin(path, payload, unencrypted_size=300 * 1024)
+        
+        self.assertTrue(await self.client.upload_intunewin_content("app", path))
+        
+        # The already encrypted payload is uploaded byte for byte, in several blocks
+        self.assertEqual(self.blob, payload)
+        self.assertEqual(len(self.blocks), 5)
+        
+        file_request = next(body for method, endpoint, body in self.requests if endpoint.endswith("/files"))
+        self.assertEqual(file_request["name"], "IntunePackage.intunewin")
+        self.assertEqual(file_request["size"], 300 * 1024)
+        self.assertEqual(file_request["sizeEncrypted"], len(payload))
+        
+        method, commit_endpoint, commit_body = self.requests[-1]
+        self.assertTrue(commit_endpoint.endswith("/files/file/commit"))
+        self.assertEqual(commit_body, {"fileEncryptionInfo": EXPECTED_ENCRYPTION_INFO})
+    
+    async def test_block_ids_are_escaped_in_the_url(self):
+        path = os.path.join(self.tmp, "app.intunewin")
+        _write_intunewin(path, os.urandom(100 * 1024), unencrypted_size=100 * 1024)
+        
+        await self.client.upload_intunewin_content("app", path)
+        
+        self.assertEqual(len(self.block_paths), 2)
+        for block_id, raw_path in zip(sorted(self.blocks), sorted(self.block_paths)):
+            # Padded base64 IDs end in '=', which has to arrive as %3D
+            self.assertTrue(block_id.endswith("="))
+            self.assertIn(f"blockid={quote(block_id, safe='')}", raw_path)
+
+
+
+class TokenCacheTests(unittest.TestCase):
+    """The MSAL token cache is persisted between runs."""
+    
+    STATE = {"AccessToken": {"key": {"credential_type": "AccessToken", "secret": "token"}}}
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.client = IntuneAPIClient("tenant", "client")
+        self.client.token_cache_path = Path(self.tmp) / ".intune_packager" / "token_cache.json"
+    
+    def _changed_cache(self) -> SerializableTokenCache:
+        cache = SerializableTokenCache()
+        cache.deserialize(json.dumps(self.STATE))
+        cache.has_state_changed = True
+        return cache
+    
+    def test_saved_cache_is_loaded_back(self):
+        self.client._save_token_cache(self._changed_cache())
+        
+        loaded = self.client._load_token_cache()
+        self.assertEqual(json.loads(loaded.serialize()), self.STATE)
+    
+    @unittest.skipIf(os.name == "nt", "POSIX permissions")
+    def test_saved_cache_is_private(self):
+        self.client._save_token_cache(self._changed_cache())
+        
+        self.assertEqual(self.client.token_cache_path.stat().st_mode & 0o777, 0o600)
+    
+    def test_unchanged_cache_is_not_written(self):
+        self.client._save_token_cache(SerializableTokenCache())
+        
+        self.assertFalse(self.client.token_cache_path.exists())
+    
+    def test_unreadable_cache_starts_empty(self):
+        self.client.token_cache_path.parent.mkdir(parents=True)
+        self.client.token_cache_path.write_text("{not json", encoding="utf-8")
+        
+        cache = self.client._load_token_cache()
+        self.assertEqual(cache.find(SerializableTokenCache.CredentialType.ACCESS_TOKEN), [])
+
+
+
+class GraphTestCase(unittest.IsolatedAsyncioTestCase):
+    """Client whose Graph calls are answered from a queue of canned responses."""
+    
+    def setUp(self):
+        self.requests = []
+        self.responses = []
+        self.client = IntuneAPIClient("tenant", "client")
+        self.client.access_token = "token"
+        self.client._make_request = self._graph
+    
+    async def _graph(self, method, endpoint, data=None, params=None, use_beta=False):
+        self.requests.append((method, endpoint, data, params))
+        return self.responses.pop(0) if self.responses else {}
+
+
+class InstallStatusPagingTests(GraphTestCase):
+    """get_app_install_status follows @odata.nextLink across pages."""
+    
+    async def test_follows_next_links(self):
+        next_page = "https://graph.microsoft.com/beta/deviceAppManagement/mobileApps/app/deviceStatuses?$skiptoken=abc"
+        last_page = "https://graph.microsoft.com/beta/deviceAppManagement/mobileApps/app/deviceStatuses?$skiptoken=def"
+        self.responses = [
+            {"value": [{"deviceName": "PC1", "installState": "installed"}], "@odata.nextLink": next_page},
+            {"value": [{"deviceName": "PC2", "installState": "failed"}], "@odata.nextLink": last_page},
+            {"value": [{"deviceName": "PC3", "installState": "notInstalled"}]}
+        ]
+        
+        summary = await self.client.get_app_install_status("app")
+        
+        self.assertEqual([request[1] for request in self.requests[1:]], [next_page, last_page])
+        self.assertEqual([device["device_name"] for device in summary["devices"]], ["PC1", "PC2", "PC3"])
+        self.assertEqual(
+            (summary["total_devices"], summary["installed"], summary["failed"], summary["pending"]),
+            (3, 1, 1, 1)
+        )
+    
+    async def test_single_page(self):
+        self.responses = [{"value": [{"deviceName": "PC1", "installState": "installed"}]}]
+        
+        summary = await self.client.get_app_install_status("app")
+        
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(summary["total_devices"], 1)
+
+
+
+class AppRelationshipsTests(GraphTestCase):
+    """set_app_relationships posts dependencies and supersedence in one request."""
+    
+    async def test_single_request_with_both_kinds(self):
+        self.assertTrue(await self.client.set_app_relationships(
+            "app", dependency_app_ids=["runtime"], superseded_app_ids=["old"], uninstall_previous=False
+        ))
+        
+        self.assertEqual(len(self.requests), 1)
+        method, endpoint, data, _ = self.requests[0]
+        self.assertEqual((method, endpoint), ("POST", "deviceAppManagement/mobileApps/app/relationships"))
+        self.assertEqual(data, {"relationships": [
+            {
+                "@odata.type": "#microsoft.graph.mobileAppDependency",
+                "targetId": "runtime",
+                "dependencyType": "autoInstall"
+            },
+            {
+                "@odata.type": "#microsoft.graph.mobileAppSupersedence",
+                "targetId": "old",
+                "supersedenceType": "update"
+            }
+        ]})
+    
+    async def test_matches_separate_calls(self):
+        await self.client.set_app_dependencies("app", ["runtime"])
+        await self.client.set_app_supersedence("app", ["old"])
+        await self.client.set_app_relationships("app", ["runtime"], ["old"])
+        
+        separate = self.requests[0][2]["relationships"] + self.requests[1][2]["relationships"]
+        self.assertEqual(self.requests[2][2]["relationships"], separate)
+    
+    async def test_missing_lists_are_empty(self):
+        await self.client.set_app_relationships("app", superseded_app_ids=["old"])
+        
+        self.assertEqual([r["targetId"] for r in self.requests[0][2]["relationships"]], ["old"])
+
+
+
+class ODataQuotingTests(GraphTestCase):
+    """Group names are quoted as OData string literals in filters."""
+    
+    def test_single_quotes_are_doubled(self):
+        self.assertEqual(IntuneAPIClient._odata_string("Sales"), "'Sales'")
+        self.assertEqual(IntuneAPIClient._odata_string("O'Brien's PCs"), "'O''Brien''s PCs'")
+    
+    async def test_group_lookup_filter(self):
+        self.responses = [{"value": [{"id": "g1", "displayName": "Devs' Laptops"}]}]
+        
+        group = await self.client.get_group_by_name("Devs' Laptops")
+        
+        self.assertEqual(group["id"], "g1")
+        self.assertEqual(self.requests[0][3]["$filter"], "displayName eq 'Devs'' Laptops'")
+    
+    async def test_group_search_filter(self):
+        await self.client.list_groups("IT's")
+        
+        self.assertEqual(self.requests[0][3]["$filter"], "startswith(displayName,'IT''s')")
+
+
+
+class SessionLifetimeTests(unittest.TestCase):
+    """The pooled HTTP session follows the running event loop."""
+    
+    def test_context_manager_closes_session(self):
+        async def run():
+            async with IntuneAPIClient("tenant", "client") as client:
+                session = await client._get_session()
+                self.assertIs(await client._get_session(), session)
+            return client, session
+        
+        client, session = asyncio.run(run())
+        self.assertTrue(session.closed)
+        self.assertIsNone(client._session)
+    
+    def test_new_event_loop_gets_new_session(self):
+        client = IntuneAPIClient("tenant", "client")
+        first = asyncio.run(client._get_session())
+        
+        async def second_run():
+            session = await client._get_session()
+            await client.close()
+            return session
+        
+        second = asyncio.run(second_run())
+        self.assertIsNot(second, first)
+        self.assertTrue(second.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+"""
+Tests for batch packaging in the orchestrator.
+"""
+
+import os
+import shutil
+import tempfile
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+from intune_packager.analyzer import AnalysisCache, ApplicationAnalyzer
+from intune_packager.orchestrator import PackageOrchestrator
+
+
+class BatchPrefetchTests(unittest.TestCase):
+    """The sequential batch path and its analysis prefetch producer."""
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        
+        # The converter only checks that the tool exists
+        self.tool = os.path.join(self.tmp, "IntuneWinAppUtil.exe")
+        self.installer = os.path.join(self.tmp, "setup.exe")
+        for path in (self.tool, self.installer):
+            with open(path, "wb") as f:
+                f.write(b"MZ not really a PE file")
+    
+    def _orchestrator(self, cached: bool) -> PackageOrchestrator:
+        cache = AnalysisCache(os.path.join(self.tmp, "analysis.json")) if cached else None
+        orchestrator = PackageOrchestrator(
+            intune_win_tool_path=self.tool,
+            analyzer=ApplicationAnalyzer(cache=cache)
+        )
+        # Packaging itself needs IntuneWinAppUtil; record the call instead
+        orchestrator.package_application = mock.Mock(
+            side_effect=lambda source_file, **kwargs: {"status": "success", "source_file": source_file}
+        )
+        return orchestrator
+    
+    def _run_batch(self, orchestrator: PackageOrchestrator, applications: list, **kwargs) -> dict:
+        """Run batch_package on a thread so a hang fails the test instead of blocking it."""
+        results = {}
+        worker = threading.Thread(
+            target=lambda: results.update(
+                orchestrator.batch_package(applications, default_output_folder=self.tmp, **kwargs)
+            ),
+            daemon=True
+        )
+        worker.start()
+        worker.join(timeout=10)
+        self.assertFalse(worker.is_alive(), "batch_package did not finish")
+        return results
+    
+    def _source_file_entry(self) -> dict:
+        # Shape produced by ConfigManager.parse_config_for_batch for a source_file app
+        return {"source_file": self.installer, "source_folder": None, "setup_file": None}
+    
+    def test_source_file_entry_with_cached_analyzer(self):
+        orchestrator = self._orchestrator(cached=True)
+        
+        results = self._run_batch(orchestrator, [self._source_file_entry(), self._source_file_entry()])
+        
+        self.assertEqual(results["successful"], 2)
+        self.assertEqual([app["index"] for app in results["applications"]], [1, 2])
+        orchestrator.package_application.assert_called_with(
+            source_file=self.installer, output_folder=self.tmp, analyze=True, quiet=False
+        )
+    
+    def test_prefetch_failure_still_delivers_every_entry(self):
+        orchestrator = self._orchestrator(cached=True)
+        orchestrator._analyze_installer = mock.Mock(side_effect=RuntimeError("analysis exploded"))
+        
+        results = self._run_batch(orchestrator, [self._source_file_entry(), {"output_folder": self.tmp}])
+        
+        self.assertEqual(results["total"], 2)
+        self.assertEqual(
+            [app["status"] for app in results["applications"]], ["success", "skipped"]
+        )
+    
+    def test_stop_on_error_ends_pipeline(self):
+        orchestrator = self._orchestrator(cached=True)
+        orchestrator.package_application.side_effect = RuntimeError("conversion failed")
+        
+        results = self._run_batch(
+            orchestrator, [self._source_file_entry()] * 3, stop_on_error=True
+        )
+        
+        self.assertEqual(len(results["applications"]), 1)
+        self.assertEqual(results["failed"], 1)
+    
+    def test_no_prefetch_without_cache(self):
+        orchestrator = self._orchestrator(cached=False)
+        
+        with mock.patch.object(PackageOrchestrator, "_prefetch_analyses") as prefetch:
+            results = self._run_batch(orchestrator, [self._source_file_entry()])
+        
+        prefetch.assert_not_called()
+        self.assertEqual(results["successful"], 1)
+
+
+
+class ResultsFileTests(unittest.TestCase):
+    """batch_package(results_file=...) streams full results as NDJSON."""
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.tool = os.path.join(self.tmp, "IntuneWinAppUtil.exe")
+        with open(self.tool, "wb") as f:
+            f.write(b"MZ")
+        self.results_file = os.path.join(self.tmp, "results.ndjson")
+        
+        self.orchestrator = PackageOrchestrator(intune_win_tool_path=self.tool)
+        self.orchestrator.package_application = mock.Mock(side_effect=lambda source_file, **kwargs: {
+            "status": "success",
+            "source_file": source_file,
+            "output_file": source_file + ".intunewin",
+            "analysis": {"imported_dlls": ["KERNEL32.dll"]}
+        })
+    
+    def _read_results(self) -> list:
+        with open(self.results_file, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+    
+    def test_full_results_in_file_and_summaries_in_memory(self):
+        applications = [{"source_file": "a.exe"}, {"output_folder": None}]
+        
+        results = self.orchestrator.batch_package(
+            applications, default_output_folder=self.tmp, results_file=self.results_file
+        )
+        
+        lines = self._read_results()
+        self.assertEqual([line["index"] for line in lines], [1, 2])
+        self.assertEqual(lines[0]["analysis"], {"imported_dlls": ["KERNEL32.dll"]})
+        self.assertEqual(results["applications"], [
+            {"index": 1, "status": "success", "source_file": "a.exe", "output_file": "a.exe.intunewin"},
+            {"index": 2, "status": "skipped", "error": "No source_file specified"},
+        ])
+        self.assertEqual((results["successful"], results["failed"]), (1, 1))
+    
+    def test_runs_append_to_the_file(self):
+        for name in ("a.exe", "b.exe"):
+            self.orchestrator.batch_package(
+                [{"source_file": name}], default_output_folder=self.tmp, results_file=self.results_file
+            )
+        
+        self.assertEqual([line["source_file"] for line in self._read_results()], ["a.exe", "b.exe"])
+    
+    def test_without_results_file_entries_stay_complete(self):
+        results = self.orchestrator.batch_package([{"source_file": "a.exe"}], default_output_folder=self.tmp)
+        
+        self.assertIn("analysis", results["applications"][0])
+        self.assertFalse(os.path.exists(self.results_file))
+
+
+class ParallelStopOnErrorTests(unittest.TestCase):
+    """stop_on_error with a thread pool still reports entries that were already running."""
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.tool = os.path.join(self.tmp, "IntuneWinAppUtil.exe")
+        with open(self.tool, "wb") as f:
+            f.write(b"MZ")
+    
+    def test_running_entries_are_recorded_after_stop(self):
+        orchestrator = PackageOrchestrator(intune_win_tool_path=self.tool)
+        slow_started = threading.Event()
+        started = []
+        
+        def package(source_file, **kwargs):
+            started.append(source_file)
+            if source_file == "bad.exe":
+                # Fail only once the slow entry is underway
+                slow_started.wait(timeout=5)
+                raise RuntimeError("conversion failed")
+            slow_started.set()
+            time.sleep(0.3)
+            return {"status": "success", "source_file": source_file, "output_file": source_file + ".intunewin"}
+        
+        orchestrator.package_application = mock.Mock(side_effect=package)
+        results_file = os.path.join(self.tmp, "results.ndjson")
+        applications = [{"source_file": name} for name in ("bad.exe", "slow.exe", "later1.exe", "later2.exe")]
+        
+        results = orchestrator.batch_package(
+            applications, default_output_folder=self.tmp, stop_on_error=True,
+            max_workers=2, parallelism="threads", results_file=results_file
+        )
+        
+        recorded = [entry["source_file"] for entry in results["applications"]]
+        # Every entry that started is reported, cancelled ones are not
+        self.assertEqual(sorted(recorded), sorted(started))
+        self.assertIn("slow.exe", recorded)
+        self.assertLess(len(recorded), len(applications))
+        self.assertEqual(results["failed"], 1)
+        self.assertEqual(results["successful"], len(recorded) - 1)
+        
+        with open(results_file, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(sorted(line["source_file"] for line in lines), sorted(recorded))
+
+
+if __name__ == "__main__":
+    unittest.main()
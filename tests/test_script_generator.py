@@ -0,0 +1,71 @@
+"""
+Tests for the script generator's template and script caches.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from intune_packager import script_generator
+from intune_packager.models.app_profile import ApplicationProfile
+from intune_packager.script_generator import ScriptGenerator
+
+
+class BytecodeCacheTests(unittest.TestCase):
+    """The on-disk template cache is opt-in."""
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+    
+    def test_no_cache_directory_by_default(self):
+        default_dir = os.path.join(self.tmp, "template_cache")
+        
+        with mock.patch.object(script_generator, "DEFAULT_BYTECODE_CACHE_DIR", default_dir):
+            generator = ScriptGenerator()
+        
+        self.assertIsNone(generator.env.bytecode_cache)
+        self.assertFalse(os.path.exists(default_dir))
+    
+    def test_given_cache_directory_is_created_and_filled(self):
+        cache_dir = os.path.join(self.tmp, "nested", "template_cache")
+        
+        generator = ScriptGenerator(bytecode_cache_dir=cache_dir)
+        
+        self.assertIsNotNone(generator.env.bytecode_cache)
+        # The three script templates are compiled in __init__
+        self.assertGreaterEqual(len(os.listdir(cache_dir)), 3)
+
+
+
+class ScriptCacheTests(unittest.TestCase):
+    """Rendered scripts are reused per profile content, up to SCRIPT_CACHE_SIZE profiles."""
+    
+    def _profile(self, version: str) -> ApplicationProfile:
+        return ApplicationProfile(name="App", version=version, publisher="Contoso")
+    
+    def test_same_content_reuses_scripts(self):
+        generator = ScriptGenerator()
+        first = generator.generate_all_scripts(self._profile("1.0"))
+        
+        with mock.patch.object(generator, "_render_install") as render:
+            second = generator.generate_all_scripts(self._profile("1.0"))
+        
+        render.assert_not_called()
+        self.assertEqual(second, first)
+    
+    def test_oldest_entry_is_evicted(self):
+        generator = ScriptGenerator()
+        generator.SCRIPT_CACHE_SIZE = 2
+        for version in ("1.0", "2.0", "3.0"):
+            generator.generate_all_scripts(self._profile(version))
+        
+        self.assertEqual(len(generator._script_cache), 2)
+        self.assertNotIn(ScriptGenerator._profile_cache_key(self._profile("1.0")), generator._script_cache)
+        self.assertIn(ScriptGenerator._profile_cache_key(self._profile("3.0")), generator._script_cache)
+
+
+if __name__ == "__main__":
+    unittest.main()